@@ -1,21 +1,62 @@
+import os
+import queue
+import sys
+import threading
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font
-from typing import NamedTuple
-from itertools import cycle
 from game_logic import SOSGame, DEFAULT_PLAYERS, Move
+from ai import make_player
+from instrument import instrument_board, instrument_game, profile
+
+COMPUTER_TIME_LIMIT = 1.0
+MAX_BOARD_SIZE = 40
+BOARD_PIXELS = 600      # canvas side length the cells are scaled to fit
+MAX_CELL_PIXELS = 80
+BOARD_MARGIN = 4
+POLL_MS = 16            # how often the Tk loop checks for a computer move (~60 fps)
+
+class FontCache:
+    """Named Tk fonts shared by every cell and game, created once per style.
+
+    Tk never frees a font.Font while the interpreter lives, so building one
+    per cell or per strike leaks; asking the cache instead keeps the number
+    of fonts bounded by the number of distinct styles.
+    """
+    def __init__(self, root):
+        self._root = root
+        self._fonts: dict[tuple[int, str], font.Font] = {}
+
+    def get(self, size: int, weight: str = "bold") -> font.Font:
+        key = (size, weight)
+        cached = self._fonts.get(key)
+        if cached is None:
+            cached = font.Font(root=self._root, size=size, weight=weight)
+            self._fonts[key] = cached
+        return cached
+
+    def __len__(self):
+        return len(self._fonts)
+
 
 # create game board
 class SOSBoard(tk.Tk):
     def __init__(self, game):
         super().__init__()
         self.title("SOS Game")
-        self._cells: dict[tk.Button, tuple[int, int]] = {}
         self._game = game
-        self._pos_to_bin: dict[tuple[int,int], tk.Button] = {}
-        self.grid_frame: tk.Frame | None = None
-        self.strike_canvas: tk.Canvas | None = None
-        self.grid_frame = None
+        self._letter_items: dict[tuple[int, int], int] = {}
+        self.board_canvas: tk.Canvas | None = None
+        self._cell_px = 0
+        self._drawn_size = 0
+        self._fonts = FontCache(self)
+        self._cell_style: dict[str, dict] = {}
+        self._computer = make_player("alphabeta", time_limit=COMPUTER_TIME_LIMIT)
+        self._computer_moves = queue.Queue()
+        self._search_token = 0
+        self._searching = False
+        self._thinking_ticks = 0
+        self.metrics = None     # set by instrument.instrument_board
         self._create_menu()
         self.create_board_display()
         self.create_board_grid()
@@ -27,7 +68,7 @@ class SOSBoard(tk.Tk):
         self.display = tk.Label(
             master=display_frame,
             text="Play!",
-            font=font.Font(size=28, weight="bold")
+            font=self._fonts.get(28)
         )
         self.display.pack(side=tk.LEFT)
         # adding controls for picking S/O, board size, and starting game
@@ -40,8 +81,6 @@ class SOSBoard(tk.Tk):
         tk.Radiobutton(controls, text="Simple", variable=self.mode_var, value="simple").pack(side=tk.LEFT)
         tk.Radiobutton(controls, text="General", variable=self.mode_var, value="general").pack(side=tk.LEFT)
 
-        self.mode_var.trace_add("write", lambda *_: print("SELECTED MODE:", self.mode_var.get()))
-
         self.letter_var = tk.StringVar(value="S")
         tk.Label(controls, text="Place:").pack(side=tk.LEFT, padx=(0,6))
         tk.Radiobutton(controls, text="S", variable=self.letter_var, value="S").pack(side=tk.LEFT)
@@ -50,105 +89,191 @@ class SOSBoard(tk.Tk):
         tk.Label(controls, text="Board size:").pack(side=tk.LEFT, padx=(12,6))
         self.size_var = tk.IntVar(value=self._game.board_size)
         self.size_slider = tk.Scale(
-            controls, from_=3, to=12, orient=tk.HORIZONTAL,
+            controls, from_=3, to=MAX_BOARD_SIZE, orient=tk.HORIZONTAL,
             variable=self.size_var, showvalue=True, length=200
         )
         self.size_slider.pack(side=tk.LEFT)
 
-        
+        # the computer always plays the second player
+        self.computer_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            controls, text=f"Computer plays {DEFAULT_PLAYERS[1].label}", variable=self.computer_var
+        ).pack(side=tk.LEFT, padx=(12,0))
+        self.computer_var.trace_add(
+            "write", lambda *_: self._play_computer_turns() if self.computer_var.get() else self._cancel_computer()
+        )
+        self.engine_var = tk.StringVar(value="alphabeta")
+        tk.OptionMenu(controls, self.engine_var, "alphabeta", "mcts").pack(side=tk.LEFT)
+        self.engine_var.trace_add("write", lambda *_: self._set_computer(self.engine_var.get()))
 
         ttk.Button(controls, text="Start New Game", command=self.start_new_game_with_size).pack(side=tk.LEFT, padx=12)
         ttk.Button(controls, text="play again", command=self.reset_board).pack(side=tk.LEFT)
 
     def create_board_grid(self):
-        
-        if self.grid_frame is not None:
-            self.grid_frame.destroy()
-            self._cells.clear()
-            self._pos_to_bin.clear()
-
-        self.grid_frame = tk.Frame(master=self)
-        self.grid_frame.pack(padx=8, pady=8)
-
-        
-        
-        for row in range(self._game.board_size):
-            self.grid_frame.rowconfigure(row, weight=1, minsize=50)
-            self.grid_frame.columnconfigure(row, weight=1, minsize=75)
-            for col in range (self._game.board_size):
-                button = tk.Button(
-                    master=self.grid_frame,
-                    text="",
-                    font=font.Font(size=36, weight="bold"),
-                    fg="black",
-                    width=3,
-                    height=2,
-                    highlightbackground="lightblue",
-                )
-                self._cells[button] = (row, col)
-                self._pos_to_bin[(row, col)] = button
-                button.bind("<ButtonPress-1>", self.play)
-                button.grid(
-                    row=row,
-                    column=col,
-                    padx=5,
-                    pady=5,
-                    sticky="nsew"
-                )
-                #self.strike_canvas = tk.Canvas(self.grid_frame, highlightthickness=0, bg=self.cget("bg"))
-        #self.strike_canvas.place(relx=0, rely=0, relwidth=1, relheight=1)
+        """Draw an empty board: one canvas with grid lines; letters are added per move."""
+        size = self._game.board_size
+        self._cell_px = max(1, min(MAX_CELL_PIXELS, BOARD_PIXELS // size))
+        side = size * self._cell_px + 2 * BOARD_MARGIN
+        if self.board_canvas is None:
+            self.board_canvas = tk.Canvas(master=self, highlightthickness=0, bg="white")
+            self.board_canvas.pack(padx=8, pady=8)
+            self.board_canvas.bind("<ButtonPress-1>", self.play)
+        self.board_canvas.delete("all")
+        self.board_canvas.config(width=side, height=side)
+        self._letter_items.clear()
+        self._cell_style.clear()
+        end = BOARD_MARGIN + size * self._cell_px
+        for i in range(size + 1):
+            at = BOARD_MARGIN + i * self._cell_px
+            self.board_canvas.create_line(at, BOARD_MARGIN, at, end, fill="lightblue", tags="grid")
+            self.board_canvas.create_line(BOARD_MARGIN, at, end, at, fill="lightblue", tags="grid")
+        self._drawn_size = size
 
-    def play(self, event):
-        print("MODE:", self._game.mode)
-        clicked_btn = event.widget
-        row, col = self._cells[clicked_btn]
+    def _cell_at(self, x: int, y: int):
+        """Board cell under canvas coordinates, or None outside the grid."""
+        row = (y - BOARD_MARGIN) // self._cell_px
+        col = (x - BOARD_MARGIN) // self._cell_px
+        if 0 <= row < self._drawn_size and 0 <= col < self._drawn_size:
+            return row, col
+        return None
 
-        chosen_letter = self.letter_var.get()
-        move = Move(row, col, chosen_letter)
+    def play(self, event):
+        cell = self._cell_at(event.x, event.y)
+        if cell is None or self._is_computer_turn():
+            return
+        row, col = cell
+        move = Move(row, col, self.letter_var.get())
         if self._game.is_valid_move(move):
-            self._update_button(clicked_btn, chosen_letter, self._game.current_player.color)
-            self._game.process_move(move)
-            new_sos = self._game.last_new_sos
-            if new_sos:
-                self._draw_strikes(new_sos, self._game.current_player.color)
-            if self._game.is_tied():
-                if self._game.mode == "general":
-                    msg=f"Tie! Scores = {self._score_text()}"
-                else:
-                    msg = "tied game!"
-                self._update_display(msg = msg, color ="red")
-            elif self._game.has_winner():
-                if self._game.mode == "simple":
-                    msg = f'Winner: {self._game.current_player.label}!'
-                    color = self._game.current_player.color
-                else:
-                    msg = f'Winner: {self._game.winner_label}! Final scores - {self._score_text()}'
-                    color = "green"
-                self._update_display(msg, color)
+            self._apply_move(move)
+            self._play_computer_turns()
+
+    def _play_computer_turns(self):
+        """Start the computer's search on a worker thread; the result arrives via _poll_computer."""
+        if self._searching or not self._is_computer_turn():
+            return
+        self._searching = True
+        self._search_token += 1
+        token, game, computer = self._search_token, self._game.clone(), self._computer
+        threading.Thread(target=self._search, args=(token, computer, game), daemon=True).start()
+        self._thinking_ticks = 0
+        self.after(POLL_MS, self._poll_computer)
+
+    def _search(self, token, computer, game):
+        # runs on the worker thread; a failed search is queued too, so the Tk side always hears back
+        try:
+            result = computer.choose_move(game)
+        except Exception as exc:
+            result = exc
+        self._computer_moves.put((token, result))
+
+    def _poll_computer(self):
+        try:
+            token, move = self._computer_moves.get_nowait()
+        except queue.Empty:
+            token = move = None
+        if token is not None and token == self._search_token and self._searching:
+            self._searching = False
+            if isinstance(move, Exception):
+                self._update_display(f"Computer move failed: {move!r}", color="red")
+                return
+            self._apply_move(move)
+            self._play_computer_turns()
+            return
+        if self._searching:
+            # anything else in the queue is from a cancelled search and is dropped
+            self._thinking_ticks += 1
+            dots = "." * (self._thinking_ticks * POLL_MS // 300 % 4)
+            self._update_display(f"{self._game.current_player.label} is thinking{dots}", color="gray")
+            self.after(POLL_MS, self._poll_computer)
+
+    def _cancel_computer(self):
+        """Abandon a running search; its late result is ignored."""
+        if self._searching:
+            self._computer.cancel()
+            self._searching = False
+            self._search_token += 1
+            # the abandoned thread may still be using the old player
+            self._computer = make_player(self.engine_var.get(), time_limit=COMPUTER_TIME_LIMIT)
+
+    def _set_computer(self, policy: str):
+        self._cancel_computer()
+        self._computer = make_player(policy, time_limit=COMPUTER_TIME_LIMIT)
+        self._play_computer_turns()
+
+    def _is_computer_turn(self) -> bool:
+        return (
+            self.computer_var.get()
+            and not self._game.is_over()
+            and self._game.current_player.label == DEFAULT_PLAYERS[1].label
+        )
+
+    def _apply_move(self, move):
+        self._update_cell(move.row, move.col, move.label, self._game.current_player.color)
+        self._game.process_move(move)
+        new_sos = self._game.last_new_sos
+        if new_sos:
+            self._draw_strikes(new_sos, self._game.current_player.color)
+        if self._game.is_tied():
+            if self._game.mode == "general":
+                msg=f"Tie! Scores = {self._score_text()}"
             else:
-                self._game.toggle_player()
-                msg = f"{self._game.current_player.label}'s turn"
-                self._update_display(msg)
+                msg = "tied game!"
+            self._update_display(msg = msg, color ="red")
+        elif self._game.has_winner():
+            if self._game.mode == "simple":
+                msg = f'Winner: {self._game.current_player.label}!'
+                color = self._game.current_player.color
+            else:
+                msg = f'Winner: {self._game.winner_label}! Final scores - {self._score_text()}'
+                color = "green"
+            self._update_display(msg, color)
+        else:
+            self._game.toggle_player()
+            msg = f"{self._game.current_player.label}'s turn"
+            self._update_display(msg)
 
     def start_new_game_with_size(self):
+        self._cancel_computer()
         size = int(self.size_var.get())
         mode = self.mode_var.get()
         self._game = SOSGame(players=DEFAULT_PLAYERS, board_size=size, mode = mode)
-        print("NEW GAME MODE:", self._game.mode)
+        if self.metrics is not None:
+            instrument_game(self._game, self.metrics)
         self._update_display(msg=f"New {size}x{size} game! Player {self._game.current_player.label} starts.")
         self.create_board_grid()
+        self._play_computer_turns()
+
+    def _update_cell(self, r: int, c: int, letter: str, color: str):
+        # only the changed cell is redrawn
+        item = self._letter_items.get((r, c))
+        style = self._style_for(color)
+        if item is None:
+            x, y = self._cell_center(r, c)
+            self._letter_items[(r, c)] = self.board_canvas.create_text(
+                x, y, text=letter, tags="letter", **style
+            )
+        else:
+            self.board_canvas.itemconfig(item, text=letter, **style)
 
-    def _update_button(self, clicked_btn, letter, color):
-        clicked_btn.config(text=letter, fg = color)
+    def _style_for(self, color: str) -> dict:
+        """Text options for a player's letters on the current board, built once per color."""
+        style = self._cell_style.get(color)
+        if style is None:
+            # negative sizes are pixels, so letters scale with the cells
+            style = {"fill": color, "font": self._fonts.get(-max(8, self._cell_px * 3 // 5))}
+            self._cell_style[color] = style
+        return style
 
     def _update_display(self, msg, color='black'):
         self.display["text"] = msg
         self.display["fg"] = color
 
     def _highlight_cells(self):
-        for button, coordinates in self._cells.items():
-            if coordinates in self._game.winner_combo:
-                button.config(highlightbackground="red")
+        half = self._cell_px // 2 - 1
+        for r, c in self._game.winner_combo:
+            x, y = self._cell_center(r, c)
+            self.board_canvas.create_rectangle(x - half, y - half, x + half, y + half,
+                                               outline="red", width=2, tags="highlight")
 
     def _create_menu(self):
         menu_bar = tk.Menu(master=self)
@@ -163,30 +288,31 @@ class SOSBoard(tk.Tk):
         menu_bar.add_cascade(label="File", menu=file_menu)
 
     def reset_board(self):
+        self._cancel_computer()
         mode = self.mode_var.get()
         size = int(self.size_var.get())
         self._game.reset_game(mode = mode, board_size=size)
-        if self.strike_canvas:
-            self.strike_canvas.delete("all")
+        if size != self._drawn_size:
+            self.create_board_grid()
+        else:
+            self.board_canvas.delete("letter", "strike", "highlight")
+            self._letter_items.clear()
         self._update_display(msg="ready?")
-        for button in self._cells.keys():
-            button.config(highlightbackground="lightblue")
-            button.config(text='')
-            button.config(fg='black')
+        self._play_computer_turns()
     
     def _cell_center(self, r: int, c: int):
-        btn = self._pos_to_bin[(r, c)]
-        x = btn.winfo_x() + btn.winfo_width() // 2
-        y = btn.winfo_y() + btn.winfo_height() // 2
+        x = BOARD_MARGIN + c * self._cell_px + self._cell_px // 2
+        y = BOARD_MARGIN + r * self._cell_px + self._cell_px // 2
         return x, y
 
     def _draw_strikes(self, triples, color: str):
+        width = max(2, self._cell_px // 12)
         for triple in triples:
-            for (r, c) in triple:
-                btn = self._pos_to_bin[(r, c)]
-                f = font.Font(font=btn["font"])
-                f.configure(overstrike=1)
-                btn.config(font=f, fg=color)
+            (r1, c1), (r2, c2) = min(triple), max(triple)
+            x1, y1 = self._cell_center(r1, c1)
+            x2, y2 = self._cell_center(r2, c2)
+            self.board_canvas.create_line(x1, y1, x2, y2, fill=color, width=width,
+                                          capstyle=tk.ROUND, tags="strike")
     
     def _score_text(self) -> str:
         return " | ".join(f"{label}: {score}" for label, score in self._game.scores.items())
@@ -198,7 +324,15 @@ class SOSBoard(tk.Tk):
 def main():
     game = SOSGame()
     board = SOSBoard(game)
-    board.mainloop()
+    # SOS_PROFILE=path times the game and redraw paths and writes a cProfile dump on exit
+    profile_path = os.environ.get("SOS_PROFILE")
+    if not profile_path:
+        board.mainloop()
+        return
+    metrics = instrument_board(board)
+    with profile(profile_path):
+        board.mainloop()
+    print(metrics.report(), file=sys.stderr)
 
 if __name__ ==  "__main__":
     main()
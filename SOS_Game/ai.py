@@ -0,0 +1,301 @@
+import time
+import random
+from collections import OrderedDict
+from functools import lru_cache
+from game_logic import Move, cell_symmetries
+from mcts import MCTSPlayer
+
+WIN_SCORE = 1000
+INFINITY = 10**9
+EXACT, LOWER, UPPER = 0, 1, 2
+TABLE_SIZE = 1_000_000
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class EvaluationCache:
+    """LRU-bounded map from position keys to search results, with hit counters.
+
+    Key it on SOSGame.canonical_key() so the 8 symmetric images of a
+    position share one entry; hits/misses are kept for tuning the size.
+    """
+    def __init__(self, maxsize: int = TABLE_SIZE):
+        assert maxsize > 0, "maxsize must be positive"
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value):
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {"size": len(self), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hit_rate}
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+class RandomPlayer:
+    """Plays a uniformly random legal move."""
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+
+    def choose_move(self, game) -> Move | None:
+        if game.is_over():
+            return None
+        return self._rng.choice(list(game.legal_moves()))
+
+
+class GreedyPlayer:
+    """Takes the move completing the most SOS lines, else a random move that
+    does not leave the opponent an SOS, else any random move."""
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+
+    def choose_move(self, game) -> Move | None:
+        if game.is_over():
+            return None
+        scoring = list(game.scoring_moves())
+        if scoring:
+            return max(scoring, key=game.sos_count)
+        cols = game.cols
+        board = game._board
+        moves = list(game.legal_moves())
+        safe = [move for move in moves if not _gives_away(board, move.row * cols + move.col, move.label)]
+        return self._rng.choice(safe or moves)
+
+
+def _gain(lines, labels, cell: int, letter: str) -> int:
+    """Number of lines placing letter on the empty cell would complete."""
+    return len(lines.completed(labels, cell, letter))
+
+
+def _gives_away(board, cell: int, letter: str) -> bool:
+    """Whether placing letter leaves a line one letter short for the opponent."""
+    return bool(board.threats(cell, letter))
+
+
+class AlphaBetaPlayer:
+    """Computer player using iterative-deepening alpha-beta (negamax) search.
+
+    Values are relative to the player to move and only count the points still
+    to be won from a position (general mode) or a win/loss/draw (simple mode),
+    so they depend on the board alone. That lets positions reached by
+    different move orders, and rotated or reflected positions, share one
+    transposition-table entry keyed by the game's canonical_key(). Best moves
+    are stored in the canonical orientation and mapped back on lookup.
+
+    Moves that complete an SOS are tried first, then the table's best move,
+    then moves that do not hand the opponent an SOS. Search stops deepening
+    when `time_limit` seconds have passed and plays the best move of the
+    deepest completed iteration, whose value is kept in `last_value`.
+    """
+    def __init__(self, time_limit: float = 1.0, max_depth: int | None = None,
+                 table_size: int = TABLE_SIZE):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.last_depth = 0
+        self.last_nodes = 0
+        self.last_value = None
+        self._tables = {}
+        self._game = None
+        self._deadline = 0.0
+        self._nodes = 0
+
+    def choose_move(self, game) -> Move | None:
+        """Best move for game.current_player. The game is left as it was found."""
+        if game.is_over():
+            return None
+        assert len(game.players) == 2, "alpha-beta search needs a two-player game"
+        rows, cols = game.rows, game.cols
+        self._game = game
+        self._board = game._board
+        self._letters = game.letters
+        self._simple = game.mode == "simple"
+        variant = (rows, cols, game.word, game.mode)
+        if variant not in self._tables:
+            self._tables[variant] = EvaluationCache(self.table_size)
+        self._table = self._tables[variant]
+        self._symmetries = cell_symmetries(rows, cols)
+        self._inverses = _inverse_symmetries(rows, cols)
+        self._empty = sorted(game._empty)
+        self._nodes = 0
+        self._deadline = time.perf_counter() + self.time_limit
+
+        best = self._ordered_moves(None)[0]
+        limit = len(self._empty)
+        if self.max_depth is not None:
+            limit = min(limit, self.max_depth)
+        self.last_depth = 0
+        self.last_value = None
+        # every node looks up its canonical key, so keep them incremental for the search
+        tracked = game.track_symmetries()
+        try:
+            for depth in range(1, limit + 1):
+                try:
+                    value = self._search(depth, -INFINITY, INFINITY)
+                except _SearchTimeout:
+                    break
+                key, sym = game.canonical()
+                cell, letter = self._table.get(key)[3]
+                best = (self._inverses[sym][cell], letter)
+                self.last_depth = depth
+                self.last_value = value
+                if self._simple and abs(value) >= WIN_SCORE:
+                    break
+        finally:
+            game.track_symmetries(tracked)
+        self.last_nodes = self._nodes
+        self._game = None
+        r, c = divmod(best[0], cols)
+        return Move(r, c, best[1])
+
+    def cancel(self):
+        """Ask a search running in another thread to stop at its next time check."""
+        self._deadline = 0.0
+
+    def _push(self, cell: int, letter: str) -> int:
+        r, c = divmod(cell, self._game.cols)
+        return len(self._game.push(Move(r, c, letter)))
+
+    def _pop(self, cell: int):
+        self._game.pop()
+
+    def _ordered_moves(self, tt_move):
+        empty, threats = self._game._empty, self._game._threats
+        ordered = [move for _, move in sorted(((gained, move) for move, gained in threats.items()
+                                               if move != tt_move), reverse=True)]
+        if tt_move is not None and tt_move[0] in empty:
+            ordered.append(tt_move)
+        quiet, risky = [], []
+        for cell in self._empty:
+            if cell not in empty:
+                continue
+            for letter in self._letters:
+                move = (cell, letter)
+                if move == tt_move or move in threats:
+                    continue
+                if _gives_away(self._board, cell, letter):
+                    risky.append(move)
+                else:
+                    quiet.append(move)
+        return ordered + quiet + risky
+
+    def _evaluate(self) -> int:
+        # the player to move will take the best immediate SOS on offer
+        best = max(self._game._threats.values(), default=0)
+        if self._simple:
+            return WIN_SCORE if best else 0
+        return best
+
+    def _search(self, depth: int, alpha: int, beta: int) -> int:
+        self._nodes += 1
+        if not self._nodes & 255 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout
+        key, sym = self._game.canonical()
+        entry = self._table.get(key)
+        tt_move = None
+        if entry is not None:
+            e_depth, e_value, e_flag, tt_move = entry
+            tt_move = (self._inverses[sym][tt_move[0]], tt_move[1])
+            if e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_value
+                if e_flag == LOWER:
+                    alpha = max(alpha, e_value)
+                else:
+                    beta = min(beta, e_value)
+                if alpha >= beta:
+                    return e_value
+        if depth == 0:
+            return self._evaluate()
+
+        alpha_start = alpha
+        best_value = -INFINITY
+        best_move = None
+        game = self._game
+        for cell, letter in self._ordered_moves(tt_move):
+            gained = self._push(cell, letter)
+            try:
+                if self._simple and gained:
+                    value = WIN_SCORE
+                elif game.is_over():
+                    value = gained
+                else:
+                    value = gained - self._search(depth - 1, gained - beta, gained - alpha)
+            finally:
+                self._pop(cell)
+            if value > best_value:
+                best_value, best_move = value, (cell, letter)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_start:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        cell, letter = best_move
+        self._table.put(key, (depth, best_value, flag, (self._symmetries[sym][cell], letter)))
+        return best_value
+
+
+@lru_cache(maxsize=None)
+def _inverse_symmetries(rows: int, cols: int):
+    inverses = []
+    for perm in cell_symmetries(rows, cols):
+        inverse = [0] * len(perm)
+        for cell, image in enumerate(perm):
+            inverse[image] = cell
+        inverses.append(tuple(inverse))
+    return tuple(inverses)
+
+
+POLICIES = {
+    "random": RandomPlayer,
+    "greedy": GreedyPlayer,
+    "alphabeta": AlphaBetaPlayer,
+    "mcts": MCTSPlayer,
+}
+
+
+def make_player(policy: str, seed=None, time_limit: float = 1.0):
+    """Build a computer player by policy name, as used by the simulators."""
+    assert policy in POLICIES, f"policy must be one of {sorted(POLICIES)}"
+    if policy == "alphabeta":
+        return AlphaBetaPlayer(time_limit=time_limit)
+    if policy == "mcts":
+        return MCTSPlayer(time_limit=time_limit, seed=seed)
+    return POLICIES[policy](seed=seed)
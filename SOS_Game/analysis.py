@@ -0,0 +1,341 @@
+"""Long-lived pool of analysis worker processes.
+
+    with AnalysisService(workers=4) as service:
+        future = service.submit(game, priority=1, timeout=0.5)
+        print(future.result().move)
+
+    python -m analysis --requests 500 --workers 4 --size 6
+
+Every worker process keeps one AlphaBetaPlayer for its whole life, so its
+transposition tables (one per board variant) and the engine's line indexes
+stay warm from request to request. Requests wait in a priority queue; a
+dispatcher thread hands the highest-priority one to an idle worker, and
+each worker runs one request at a time so priorities hold for everything
+still queued. A request with a `session` (a game id, say) goes back to the
+worker that last served that session when it is idle, since that worker's
+table already holds the game's earlier positions.
+
+A deadline caps the search time (less DEADLINE_MARGIN for the round trip),
+and a request still queued when its deadline passes fails with TimeoutError.
+Results come back as concurrent.futures.Futures; analyze() awaits one from
+asyncio. stats() reports throughput and queue and search latency histograms.
+
+Games travel to the workers pickled without their shared tables (see
+SOSGame.__getstate__), so each worker reuses its own cached line index. A
+worker process that dies fails the request it was running with
+RuntimeError and is replaced by a fresh one with a cold table.
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import multiprocessing
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+from game_logic import SOSGame, Move
+from ai import AlphaBetaPlayer, TABLE_SIZE
+from instrument import Histogram
+
+TIME_LIMIT = 1.0
+DEADLINE_MARGIN = 0.05
+MAX_SESSIONS = 10_000
+WORKER_CHECK_INTERVAL = 0.5     # seconds between liveness checks while no result arrives
+KINDS = ("best_move", "score")
+
+
+class Analysis(NamedTuple):
+    move: Move | None
+    value: int | None       # for the player to move, as in AlphaBetaPlayer; None if no iteration finished
+    depth: int
+    nodes: int
+    worker: int
+    queue_seconds: float
+    search_seconds: float
+
+
+class _Request:
+    __slots__ = ("id", "game", "kind", "priority", "deadline", "session", "future", "submitted", "queued",
+                 "worker")
+
+    def __init__(self, request_id, game, kind, priority, deadline, session):
+        self.id = request_id
+        self.game = game
+        self.kind = kind
+        self.priority = priority
+        self.deadline = deadline
+        self.session = session
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self.queued = 0.0
+        self.worker = None
+
+
+def _worker(index: int, tasks, results, table_size: int):
+    player = AlphaBetaPlayer(table_size=table_size)
+    while (task := tasks.get()) is not None:
+        request_id, game, kind, budget = task
+        start = time.perf_counter()
+        try:
+            player.time_limit = budget
+            move = player.choose_move(game)
+            if kind == "score":
+                move = None
+            payload = (move, player.last_value, player.last_depth, player.last_nodes)
+            ok = True
+        except Exception as exc:    # sent back to the caller's future
+            payload, ok = exc, False
+        results.put((request_id, index, ok, payload, time.perf_counter() - start))
+
+
+class AnalysisService:
+    """Best-move and score requests served by a fixed pool of warm worker processes."""
+    def __init__(self, workers: int | None = None, time_limit: float = TIME_LIMIT,
+                 table_size: int = TABLE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.time_limit = time_limit
+        self._cond = threading.Condition()
+        self._queue = []            # heap of (-priority, seq, request)
+        self._running = {}          # request id -> request
+        self._idle = list(range(self.workers))
+        self._sessions = {}         # session -> worker that last served it
+        self._next_id = 0
+        self._closed = False
+        self.submitted = self.completed = self.expired = self.failed = self.restarts = 0
+        self.queue_latency = Histogram()
+        self.search_latency = Histogram()
+        self._started = time.monotonic()
+
+        self._context = multiprocessing.get_context()
+        self._table_size = table_size
+        self._results = self._context.Queue()
+        self._tasks = [None] * self.workers
+        self._processes = [None] * self.workers
+        for i in range(self.workers):
+            self._start_worker(i)
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._dispatcher.start()
+        self._collector.start()
+
+    def _start_worker(self, index: int):
+        # a fresh task queue too: a process killed inside get() leaves the old one's lock held
+        self._tasks[index] = tasks = self._context.Queue()
+        self._processes[index] = process = self._context.Process(
+            target=_worker, args=(index, tasks, self._results, self._table_size), daemon=True)
+        process.start()
+
+    def submit(self, game: SOSGame, kind: str = "best_move", priority: int = 0,
+               timeout: float | None = None, session=None) -> Future:
+        """Queue a position; higher priorities run first, equal ones in submission order.
+
+        The game is copied, so it can keep changing after this returns. The
+        future resolves to an Analysis, or fails with TimeoutError if it is
+        still queued `timeout` seconds from now.
+        """
+        assert kind in KINDS, f"kind must be one of {KINDS}"
+        assert not game.is_over(), "finished games cannot be analysed"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("the analysis service is closed")
+            request = _Request(self._next_id, game.clone(), kind, priority, deadline, session)
+            self._next_id += 1
+            self.submitted += 1
+            heapq.heappush(self._queue, (-priority, request.id, request))
+            self._cond.notify_all()
+        return request.future
+
+    async def analyze(self, game: SOSGame, kind: str = "best_move", priority: int = 0,
+                      timeout: float | None = None, session=None) -> Analysis:
+        """submit(), awaited from an asyncio event loop."""
+        return await asyncio.wrap_future(self.submit(game, kind, priority, timeout, session))
+
+    def _expire(self, now: float):
+        # called with the lock held: fail queued requests whose deadline has passed
+        live = []
+        for entry in self._queue:
+            request = entry[2]
+            if request.deadline is not None and request.deadline - DEADLINE_MARGIN <= now:
+                self.expired += 1
+                if request.future.set_running_or_notify_cancel():
+                    request.future.set_exception(TimeoutError(f"request {request.id} expired in the queue"))
+            else:
+                live.append(entry)
+        if len(live) != len(self._queue):
+            heapq.heapify(live)
+            self._queue = live
+
+    def _dispatch(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if self._closed:
+                    return
+                if not (self._queue and self._idle):
+                    deadlines = [entry[2].deadline for entry in self._queue if entry[2].deadline is not None]
+                    wait = max(0.0, min(deadlines) - DEADLINE_MARGIN - now) if deadlines else None
+                    self._cond.wait(wait)
+                    continue
+                request = heapq.heappop(self._queue)[2]
+                if not request.future.set_running_or_notify_cancel():
+                    continue        # cancelled while queued
+                budget = self.time_limit
+                if request.deadline is not None:
+                    budget = min(budget, request.deadline - DEADLINE_MARGIN - now)
+                worker = self._sessions.get(request.session)
+                if worker in self._idle:
+                    self._idle.remove(worker)
+                else:
+                    worker = self._idle.pop(0)
+                if request.session is not None:
+                    sessions = self._sessions
+                    sessions.pop(request.session, None)
+                    sessions[request.session] = worker
+                    if len(sessions) > MAX_SESSIONS:
+                        del sessions[next(iter(sessions))]
+                request.queued = now - request.submitted
+                self.queue_latency.add(int(request.queued * 1e9))
+                request.worker = worker
+                self._running[request.id] = request
+                self._tasks[worker].put((request.id, request.game, request.kind, budget))
+                request.game = None
+
+    def _replace_dead_workers(self):
+        # called with the lock held: take back what dead workers were running and start new ones
+        dead = {i: process.exitcode for i, process in enumerate(self._processes) if not process.is_alive()}
+        if self._closed or not dead:
+            return []
+        lost = [request for request in self._running.values() if request.worker in dead]
+        for request in lost:
+            del self._running[request.id]
+        for i in dead:
+            self._tasks[i].close()
+            self._start_worker(i)
+            self.restarts += 1
+            if i not in self._idle:
+                self._idle.append(i)
+        self.failed += len(lost)
+        self._cond.notify_all()
+        return [(request, RuntimeError(f"analysis worker {request.worker} died (exit code "
+                                       f"{dead[request.worker]}) running request {request.id}"))
+                for request in lost]
+
+    def _check_workers(self):
+        with self._cond:
+            lost = self._replace_dead_workers()
+        for request, error in lost:
+            request.future.set_exception(error)
+
+    def _collect(self):
+        checked = time.monotonic()
+        while True:
+            try:
+                result = self._results.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                result = False
+            if result is None:
+                return
+            if time.monotonic() - checked >= WORKER_CHECK_INTERVAL:
+                self._check_workers()
+                checked = time.monotonic()
+            if not result:
+                continue
+            request_id, worker, ok, payload, seconds = result
+            with self._cond:
+                request = self._running.pop(request_id, None)
+                if request is None:
+                    continue        # already failed when its worker was found dead
+                self._idle.append(worker)
+                self._cond.notify_all()
+                if ok:
+                    self.completed += 1
+                    self.search_latency.add(int(seconds * 1e9))
+                else:
+                    self.failed += 1
+            if ok:
+                move, value, depth, nodes = payload
+                request.future.set_result(Analysis(move, value, depth, nodes, worker, request.queued, seconds))
+            else:
+                request.future.set_exception(payload)
+
+    def stats(self) -> dict:
+        with self._cond:
+            elapsed = time.monotonic() - self._started
+            return {
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "expired": self.expired,
+                "failed": self.failed,
+                "restarts": self.restarts,
+                "queued": len(self._queue),
+                "running": len(self._running),
+                "per_second": self.completed / elapsed if elapsed else 0.0,    # since the pool started
+                "queue_latency": self.queue_latency.as_dict(),
+                "search_latency": self.search_latency.as_dict(),
+            }
+
+    def close(self):
+        """Stop the workers; requests still queued fail with RuntimeError."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            for _, _, request in self._queue:
+                if request.future.set_running_or_notify_cancel():
+                    request.future.set_exception(RuntimeError("the analysis service was closed"))
+            self._queue.clear()
+            self._cond.notify_all()
+        self._dispatcher.join()
+        for tasks in self._tasks:
+            tasks.put(None)
+        for process in self._processes:
+            process.join()
+        self._results.put(None)
+        self._collector.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _random_position(size: int, mode: str, rng: random.Random) -> SOSGame:
+    game = SOSGame(board_size=size, mode=mode)
+    for _ in range(rng.randrange(size * size // 2)):
+        game.push(rng.choice(list(game.legal_moves())))
+        if game.is_over():
+            game.pop()
+            break
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m analysis",
+                                     description="Send random positions through an analysis pool.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    parser.add_argument("--size", type=int, default=6)
+    parser.add_argument("--mode", choices=("simple", "general"), default="general")
+    parser.add_argument("--time-limit", type=float, default=0.1, help="search seconds per request")
+    parser.add_argument("--timeout", type=float, default=None, help="deadline per request, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    games = [_random_position(args.size, args.mode, rng) for _ in range(args.requests)]
+    with AnalysisService(args.workers, args.time_limit) as service:
+        futures = [service.submit(game, priority=rng.randrange(3), timeout=args.timeout) for game in games]
+        for future in futures:
+            future.exception()
+        print(json.dumps(service.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Vectorized SOS engine stepping many games in lockstep with NumPy.
+
+All boards share one size and mode and are held in a single (B, n, n) int8
+array (padded by two cells on every side so neighbour lookups never leave
+the array). Each call to step() plays one move on every unfinished board and
+counts the SOS lines it completes for all boards at once, by comparing the
+cells one and two steps away along each of SOSGame.DIRECTIONS.
+
+This is meant for rollouts and Monte Carlo evaluation; use SOSGame when the
+triples themselves, undo or per-move validation messages are needed. Turn
+order follows SOSGame.push: the turn passes after every move that does not
+end the game.
+"""
+import numpy as np
+from game_logic import SOSGame
+
+EMPTY, S, O = 0, 1, 2
+LETTER_CODES = {"": EMPTY, "S": S, "O": O}
+PAD = 2
+
+_RAYS = np.array(SOSGame.DIRECTIONS, dtype=np.intp)
+
+
+class BatchSOSGame:
+    def __init__(self, batch: int, board_size: int, mode: str = "general", n_players: int = 2):
+        assert mode in {"simple", "general"}, "mode must be 'simple' or 'general'"
+        self.batch = batch
+        self.board_size = board_size
+        self.mode = mode
+        self.n_players = n_players
+        padded = board_size + 2 * PAD
+        self.boards = np.zeros((batch, padded, padded), dtype=np.int8)
+        self.scores = np.zeros((batch, n_players), dtype=np.int32)
+        self.turn = np.zeros(batch, dtype=np.int8)
+        self.empty = np.full(batch, board_size * board_size, dtype=np.int32)
+        self.done = np.zeros(batch, dtype=bool)
+        self.winner = np.full(batch, -1, dtype=np.int8)
+        self._index = np.arange(batch)
+        self._offsets = self._index * (padded * padded)
+
+    @classmethod
+    def from_game(cls, game: SOSGame, batch: int):
+        """`batch` copies of a scalar game's current position."""
+        assert game.rows == game.cols and game.word == "SOS", "the batch engine plays square SOS boards"
+        size = game.board_size
+        engine = cls(batch, size, game.mode, len(game.players))
+        cells = np.array(
+            [[LETTER_CODES[game._cell_label(r, c)] for c in range(size)] for r in range(size)],
+            dtype=np.int8,
+        )
+        engine.boards[:, PAD:PAD + size, PAD:PAD + size] = cells
+        engine.scores[:] = [game.scores[p.label] for p in game.players]
+        engine.turn[:] = game._turn
+        engine.empty[:] = game._empty_count
+        engine.done[:] = game.is_over()
+        if game.has_winner():
+            labels = [p.label for p in game.players]
+            engine.winner[:] = labels.index(game.winner_label)
+        return engine
+
+    @property
+    def cells(self):
+        """(B, n, n) view of the boards without padding."""
+        return self.boards[:, PAD:-PAD, PAD:-PAD]
+
+    def step(self, rows, cols, letters):
+        """Play one move per board; returns the SOS lines each move completed.
+
+        rows/cols are (B,) cell coordinates and letters (B,) codes S or O.
+        Boards that are already finished, or whose move targets an occupied
+        or off-board cell, are left untouched and score 0.
+        """
+        n = self.board_size
+        padded = n + 2 * PAD
+        flat = self.boards.reshape(-1)
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        inside = (0 <= rows) & (rows < n) & (0 <= cols) & (cols < n)
+        # off-board moves look at the board's first cell instead, so every read stays on that board
+        pos = self._offsets + (np.where(inside, rows, 0) + PAD) * padded + np.where(inside, cols, 0) + PAD
+        letters = np.asarray(letters, dtype=np.int8)
+        live = ~self.done & inside & (flat[pos] == EMPTY)
+        flat[pos[live]] = letters[live]
+
+        rays = _RAYS[:, 0] * padded + _RAYS[:, 1]
+        axes = rays[::2]
+        at = pos[:, None]
+        s_hits = ((flat[at + rays] == O) & (flat[at + 2 * rays] == S)).sum(axis=1)
+        o_hits = ((flat[at - axes] == S) & (flat[at + axes] == S)).sum(axis=1)
+        gained = np.where(letters == S, s_hits, o_hits) * live
+
+        self.empty -= live
+        if self.mode == "simple":
+            won = gained > 0
+            self.winner[won] = self.turn[won]
+            finished = live & (won | (self.empty == 0))
+        else:
+            self.scores[self._index, self.turn] += gained.astype(np.int32)
+            finished = live & (self.empty == 0)
+            if finished.any():
+                final = self.scores[finished]
+                top = final.max(axis=1)
+                unique = (final == top[:, None]).sum(axis=1) == 1
+                self.winner[finished] = np.where(unique, final.argmax(axis=1), -1)
+        self.done |= finished
+        passing = live & ~finished
+        self.turn[passing] = (self.turn[passing] + 1) % self.n_players
+        return gained
+
+    def random_moves(self, rng: np.random.Generator):
+        """A uniformly random empty cell and letter for every board."""
+        n = self.board_size
+        open_cells = self.cells.reshape(self.batch, n * n) == EMPTY
+        pick = np.where(open_cells, rng.random((self.batch, n * n)), -1.0).argmax(axis=1)
+        rows, cols = np.divmod(pick, n)
+        return rows, cols, self._random_letters(rng)
+
+    def _random_letters(self, rng: np.random.Generator):
+        return np.where(rng.random(self.batch) < 0.5, S, O).astype(np.int8)
+
+    def play_random(self, rng: np.random.Generator | None = None):
+        """Finish every board with random moves; returns (scores, winner).
+
+        Each board's empty cells are shuffled once up front, which gives the
+        same distribution as picking a random empty cell every move.
+        """
+        rng = rng or np.random.default_rng()
+        n = self.board_size
+        open_cells = self.cells.reshape(self.batch, n * n) == EMPTY
+        order = np.where(open_cells, rng.random((self.batch, n * n)), 2.0).argsort(axis=1)
+        rows, cols = np.divmod(order, n)
+        for t in range(int(self.empty.max())):
+            if self.done.all():
+                break
+            self.step(rows[:, t], cols[:, t], self._random_letters(rng))
+        return self.scores, self.winner
@@ -0,0 +1,240 @@
+"""Benchmarks for the engine and GUI hot paths.
+
+    python -m benchmarks --out bench.json
+    python -m benchmarks --baseline bench.json --threshold 0.25
+
+Every benchmark is seeded, so runs measure the same work. As with timeit,
+each sample loops the benchmark until it lasts at least MIN_SAMPLE seconds.
+Samples are taken `--repeat` times, and the best is reported as seconds per
+operation (per move, per cell, per call) to keep noise from other processes
+out. With --baseline, results are compared against a saved run and the exit
+status is 1 if any benchmark got slower by more than the threshold. The GUI
+benchmarks need a display; without one they are listed under "skipped".
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from game_logic import SOSGame, Move
+
+SIZES = (3, 6, 12, 25, 50, 100)
+QUICK_SIZES = (3, 6, 12)
+GUI_MAX_SIZE = 40
+REPEAT = 5
+MIN_SAMPLE = 0.05
+THRESHOLD = 0.25
+
+
+def _random_order(size: int, seed: int):
+    """Every cell once, in a seeded random order, each with a seeded random letter."""
+    rng = random.Random(seed)
+    cells = [(r, c) for r in range(size) for c in range(size)]
+    rng.shuffle(cells)
+    return [Move(r, c, rng.choice("SO")) for r, c in cells]
+
+
+def _played(size: int, mode: str, seed: int = 0) -> SOSGame:
+    """A game played to the end in _random_order."""
+    game = SOSGame(board_size=size, mode=mode)
+    for move in _random_order(size, seed):
+        if game.is_over():
+            break
+        game.push(move)
+    return game
+
+
+def _process_move(size: int, mode: str):
+    moves = [entry.move for entry in _played(size, mode)._history]
+    empty = SOSGame(board_size=size, mode=mode)
+
+    def run():
+        game = empty.clone()
+        for move in moves:
+            game.process_move(move)
+    return run, len(moves)
+
+
+def _find_new_sos(size: int, mode: str):
+    game = _played(size, "general")
+    moves = [entry.move for entry in game._history]
+
+    def run():
+        for move in moves:
+            game._find_new_sos_from_move(move)
+    return run, len(moves)
+
+
+def _playout(size: int, mode: str):
+    order = _random_order(size, 1)
+    moves = len(_played(size, mode, 1)._history)
+
+    def run():
+        game = SOSGame(board_size=size, mode=mode)
+        for move in order:
+            if game.is_over():
+                break
+            game.push(move)
+    return run, moves
+
+
+def _reset_game(size: int, mode: str):
+    game = _played(size, mode)
+
+    def run():
+        game.reset_game()
+    return run, 1
+
+
+def _clone(size: int, mode: str):
+    game = SOSGame(board_size=size, mode=mode)
+    for move in _random_order(size, 2)[:size * size // 2]:
+        if game.is_over():
+            break
+        game.push(move)
+
+    def run():
+        game.clone()
+    return run, 1
+
+
+ENGINE_BENCHMARKS = {
+    "process_move": _process_move,
+    "find_new_sos": _find_new_sos,
+    "playout": _playout,
+    "reset_game": _reset_game,
+    "clone": _clone,
+}
+
+
+def _sample(run, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        run()
+    return time.perf_counter() - start
+
+
+def _time(run, ops: int, repeat: int) -> float:
+    number = 1
+    while _sample(run, number) < MIN_SAMPLE:
+        number *= 2
+    best = min(_sample(run, number) for _ in range(repeat))
+    return best / (number * ops)
+
+
+def run_engine(sizes=SIZES, repeat: int = REPEAT) -> dict:
+    results = {}
+    for name, make in ENGINE_BENCHMARKS.items():
+        modes = ("general",) if name == "find_new_sos" else ("simple", "general")
+        for mode in modes:
+            for size in sizes:
+                run, ops = make(size, mode)
+                results[f"{name}/{mode}/{size}"] = {"seconds": _time(run, ops, repeat), "ops": ops}
+    return results
+
+
+def run_gui(sizes=SIZES, repeat: int = REPEAT):
+    """GUI results, or (None, reason) when Tk is missing or cannot open a window."""
+    try:
+        import tkinter as tk
+        from GUI import SOSBoard
+    except ImportError as exc:
+        return None, f"Tk unavailable: {exc}"
+    try:
+        board = SOSBoard(SOSGame(board_size=3))
+    except tk.TclError as exc:
+        return None, f"Tk unavailable: {exc}"
+    board.withdraw()
+    results = {}
+    try:
+        for size in (s for s in sizes if s <= GUI_MAX_SIZE):
+            board._game = SOSGame(board_size=size, mode="general")
+
+            def grid():
+                board.create_board_grid()
+                board.update_idletasks()
+            results[f"create_board_grid/{size}"] = {"seconds": _time(grid, 1, repeat), "ops": 1}
+
+            triples = []
+            game = _played(size, "general")
+            for move in (entry.move for entry in game._history):
+                triples.extend(game._find_new_sos_from_move(move))
+
+            def strikes():
+                board._draw_strikes(triples, "red")
+                board.update_idletasks()
+                board.board_canvas.delete("strike")
+            results[f"draw_strikes/{size}"] = {"seconds": _time(strikes, max(1, len(triples)), repeat),
+                                               "ops": len(triples)}
+    finally:
+        board.destroy()
+    return results, None
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD):
+    """Benchmarks present in both runs as (name, old, new, ratio), slowest ratio first,
+    and the names of those slower than the baseline by more than `threshold`."""
+    rows = []
+    for name, entry in results.items():
+        old = baseline.get(name)
+        if old is None or not old["seconds"]:
+            continue
+        rows.append((name, old["seconds"], entry["seconds"], entry["seconds"] / old["seconds"]))
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows, [name for name, _, _, ratio in rows if ratio > 1 + threshold]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Time the SOS engine and GUI.")
+    parser.add_argument("--out", help="write results as JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown before failing, as a fraction (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--sizes", type=int, nargs="+", default=None, help=f"board sizes (default: {SIZES})")
+    parser.add_argument("--quick", action="store_true", help=f"only sizes {QUICK_SIZES}")
+    parser.add_argument("--no-gui", action="store_true", help="skip the GUI benchmarks")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    results = run_engine(sizes, args.repeat)
+    skipped = {}
+    if args.no_gui:
+        skipped["gui"] = "--no-gui"
+    else:
+        gui, reason = run_gui(sizes, args.repeat)
+        if gui is None:
+            skipped["gui"] = reason
+        else:
+            results.update(gui)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+        "skipped": skipped,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        rows, regressions = compare(results, baseline, args.threshold)
+        for name, old, new, ratio in rows:
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:32} {old * 1e6:12.2f}us {new * 1e6:12.2f}us {ratio:6.2f}x{flag}", file=sys.stderr)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than baseline by more than "
+                  f"{args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
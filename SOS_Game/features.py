@@ -0,0 +1,254 @@
+"""Feature planes for training move-evaluation models, built with NumPy.
+
+A position becomes a (C, rows, cols) stack of planes, in this order:
+
+    one plane per letter    1 where that letter is on the board
+    empty                   1 on empty cells
+    one plane per player    1 on cells of lines that player completed, in seat order
+    one "completes" plane   per letter, the number of lines that letter would
+                            complete on each empty cell
+
+The "completes" planes are read straight from the engine's threat index
+(SOSGame._threats, kept up to date from the line index on every move), so
+no cell is ever tried move by move. Positions are written into preallocated
+FeatureBatch arrays; iter_batches() streams batches from any iterable of
+SOSGame states, GameRecords or move lists and reuses one set of buffers, so
+dataset generation runs in bounded memory.
+
+    python -m features games.sosr --out dataset/ --batch 4096
+
+writes planes.npy, to_move.npy, scores.npy and next_move.npy for every
+position before each move in a record file, one batch at a time.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import NamedTuple
+import numpy as np
+from game_logic import SOSGame, Move, BOARD_SIZE, DEFAULT_PLAYERS, board_shape
+from records import GameRecord, read_records
+
+BATCH_SIZE = 1024
+
+
+class FeatureBatch(NamedTuple):
+    planes: np.ndarray      # (B, C, rows, cols)
+    to_move: np.ndarray     # (B,) seat of the player to move
+    scores: np.ndarray      # (B, n_players) in seat order
+    next_move: np.ndarray   # (B,) move played from the position, as cell * len(letters) + letter; -1 if unknown
+
+    def copy(self) -> "FeatureBatch":
+        return FeatureBatch(*(array.copy() for array in self))
+
+
+class FeatureExtractor:
+    """Writes positions of one board shape, word and player count into feature batches."""
+    def __init__(self, board_size=BOARD_SIZE, word: str = "SOS", n_players: int = 2, dtype=np.float32):
+        self.rows, self.cols = board_shape(board_size)
+        self.word = word
+        self.letters = tuple(dict.fromkeys(word))
+        self.n_players = n_players
+        self.dtype = np.dtype(dtype)
+        n_letters = len(self.letters)
+        self.empty_plane = n_letters
+        self.owner_planes = n_letters + 1
+        self.completes_planes = n_letters + 1 + n_players
+        self.names = (self.letters + ("empty",) + tuple(f"owner_{seat}" for seat in range(n_players))
+                      + tuple(f"completes_{letter}" for letter in self.letters))
+        self.shape = (len(self.names), self.rows, self.cols)
+        self._letter_index = {letter: i for i, letter in enumerate(self.letters)}
+
+    @classmethod
+    def for_game(cls, game: SOSGame, dtype=np.float32) -> "FeatureExtractor":
+        return cls((game.rows, game.cols), game.word, len(game.players), dtype)
+
+    def matches(self, game: SOSGame) -> bool:
+        return (game.rows == self.rows and game.cols == self.cols and game.word == self.word
+                and len(game.players) == self.n_players)
+
+    def new_batch(self, size: int = BATCH_SIZE) -> FeatureBatch:
+        return FeatureBatch(
+            planes=np.zeros((size,) + self.shape, dtype=self.dtype),
+            to_move=np.zeros(size, dtype=np.int8),
+            scores=np.zeros((size, self.n_players), dtype=np.int32),
+            next_move=np.full(size, -1, dtype=np.int32),
+        )
+
+    def move_index(self, move: Move) -> int:
+        return (move.row * self.cols + move.col) * len(self.letters) + self._letter_index[move.label]
+
+    def write(self, batch: FeatureBatch, i: int, game: SOSGame, next_move: Move | None = None):
+        """Fill slot i of the batch with the game's current position."""
+        assert self.matches(game), "game does not match this extractor"
+        planes = batch.planes[i].reshape(len(self.names), -1)
+        planes.fill(0)
+        planes[self.empty_plane] = 1
+        history, cols, index = game._history, self.cols, self._letter_index
+        if history:
+            cells = [entry.move.row * cols + entry.move.col for entry in history]
+            planes[[index[entry.move.label] for entry in history], cells] = 1
+            planes[self.empty_plane, cells] = 0
+        owners, owned = [], []
+        for entry in history:
+            for line in entry.made:
+                for r, c in line:
+                    owners.append(self.owner_planes + entry.mover)
+                    owned.append(r * cols + c)
+        if owners:
+            planes[owners, owned] = 1
+        self._write_threats(planes, game)
+        self._write_scalars(batch, i, game, next_move)
+
+    def _write_threats(self, planes, game: SOSGame):
+        threats = game._threats
+        if threats:
+            base, index = self.completes_planes, self._letter_index
+            planes[[base + index[letter] for _, letter in threats], [cell for cell, _ in threats]] = \
+                list(threats.values())
+
+    def _write_scalars(self, batch: FeatureBatch, i: int, game: SOSGame, next_move: Move | None):
+        batch.to_move[i] = game._turn
+        batch.scores[i] = [game.scores[player.label] for player in game.players]
+        batch.next_move[i] = -1 if next_move is None else self.move_index(next_move)
+
+    def positions(self, moves, players=None, mode: str = "general"):
+        """Replay a move list, yielding a writer for the position before each move.
+
+        Each yielded callable fills a batch slot, as write() does, from planes
+        kept up to date move by move instead of rebuilt from the history. It
+        must be called before the generator is advanced to the next move.
+        """
+        players = players or DEFAULT_PLAYERS
+        game = SOSGame(players=players, board_size=(self.rows, self.cols), mode=mode, word=self.word)
+        assert self.matches(game), "players do not match this extractor"
+        state = np.zeros((self.completes_planes, self.rows * self.cols), dtype=self.dtype)
+        state[self.empty_plane] = 1
+        for move in moves:
+            def fill(batch, i, _move=move):
+                planes = batch.planes[i].reshape(len(self.names), -1)
+                planes[:self.completes_planes] = state
+                planes[self.completes_planes:] = 0
+                self._write_threats(planes, game)
+                self._write_scalars(batch, i, game, _move)
+            yield fill
+            mover = game._turn
+            made = game.push(move)
+            cell = move.row * self.cols + move.col
+            state[self._letter_index[move.label], cell] = 1
+            state[self.empty_plane, cell] = 0
+            owner = state[self.owner_planes + mover]
+            for line in made:
+                for r, c in line:
+                    owner[r * self.cols + c] = 1
+
+
+def _fillers(source, extractor: FeatureExtractor):
+    for item in source:
+        if isinstance(item, SOSGame):
+            yield lambda batch, i, _game=item: extractor.write(batch, i, _game)
+        elif isinstance(item, GameRecord):
+            assert board_shape(item.board_size) == (extractor.rows, extractor.cols), \
+                "record does not match this extractor"
+            yield from extractor.positions(item.moves, item.players, item.mode)
+        else:
+            yield from extractor.positions(item)
+
+
+def iter_batches(source, batch_size: int = BATCH_SIZE, extractor: FeatureExtractor | None = None,
+                 copy: bool = False):
+    """Stream FeatureBatches of up to batch_size positions.
+
+    `source` yields SOSGame states (one position each), records.GameRecords
+    or plain lists of Moves (every position before each move, with the move
+    as next_move). Without an extractor one is built for the first item, or
+    for a standard board when that is a move list. The same buffers are
+    refilled for every batch unless copy is set, so keep or copy each batch
+    before asking for the next; the last batch is a slice of them.
+    """
+    items = iter(source)
+    first = next(items, None)
+    if first is None:
+        return
+    if extractor is None:
+        if isinstance(first, SOSGame):
+            extractor = FeatureExtractor.for_game(first)
+        elif isinstance(first, GameRecord):
+            extractor = FeatureExtractor(first.board_size, n_players=len(first.players))
+        else:
+            extractor = FeatureExtractor()
+    batch = extractor.new_batch(batch_size)
+    filled = 0
+    for fill in _fillers(_chain(first, items), extractor):
+        fill(batch, filled)
+        filled += 1
+        if filled == batch_size:
+            yield batch.copy() if copy else batch
+            filled = 0
+    if filled:
+        yield FeatureBatch(*(array[:filled].copy() if copy else array[:filled] for array in batch))
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def extract(games, extractor: FeatureExtractor | None = None) -> FeatureBatch:
+    """One batch holding the current position of every game in a sequence."""
+    games = list(games)
+    assert games, "no games to extract"
+    extractor = extractor or FeatureExtractor.for_game(games[0])
+    batch = extractor.new_batch(len(games))
+    for i, game in enumerate(games):
+        extractor.write(batch, i, game)
+    return batch
+
+
+def write_dataset(records_path, out_dir, batch_size: int = BATCH_SIZE, dtype=np.uint8) -> int:
+    """Write the features of every position in a record file as .npy arrays; returns the count.
+
+    The file is read twice, once to count positions so the arrays can be
+    memory-mapped at their final size, then to fill them batch by batch.
+    """
+    total = 0
+    first = None
+    for record in read_records(records_path):
+        first = first or record
+        total += len(record.moves)
+    if first is None:
+        return 0
+    extractor = FeatureExtractor(first.board_size, n_players=len(first.players), dtype=dtype)
+    os.makedirs(out_dir, exist_ok=True)
+    template = extractor.new_batch(1)
+    arrays = [
+        np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode="w+",
+                                  dtype=array.dtype, shape=(total,) + array.shape[1:])
+        for name, array in zip(FeatureBatch._fields, template)
+    ]
+    pos = 0
+    for batch in iter_batches(read_records(records_path), batch_size, extractor):
+        count = len(batch.planes)
+        for out, array in zip(arrays, batch):
+            out[pos:pos + count] = array
+        pos += count
+    for out in arrays:
+        out.flush()
+    return pos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m features",
+                                     description="Turn a record file into feature arrays.")
+    parser.add_argument("path", help="record file written by records.RecordWriter")
+    parser.add_argument("--out", required=True, help="directory for the .npy files")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    count = write_dataset(args.path, args.out, args.batch)
+    elapsed = time.perf_counter() - start
+    print(f"{count} positions in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
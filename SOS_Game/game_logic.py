@@ -1,8 +1,7 @@
-import tkinter as tk
-from tkinter import ttk
-from tkinter import font
+import random
+from operator import xor
 from typing import NamedTuple
-from itertools import cycle
+from functools import lru_cache
 
 class Player(NamedTuple):
     label: str
@@ -20,6 +19,396 @@ DEFAULT_PLAYERS=(
 )
 
 
+class HistoryEntry(NamedTuple):
+    """One processed move: the move, who made it and the lines it completed,
+    then the state undo_move() puts back."""
+    move: Move
+    mover: int              # index into players
+    made: list              # the lines the move completed, as process_move returned them
+    has_winner: bool
+    game_over: bool
+    winner_label: str | None
+    winner_combo: list
+    last_new_sos: list
+    leader: str | None
+    leader_score: int
+    leader_shared: bool
+    at_cell: list           # threat counts per letter on the move's cell before it was filled
+
+
+
+class LineIndex(NamedTuple):
+    """Every straight line that can spell the pattern word, numbered once per board shape.
+
+    Cells are flat indices (row * cols + col). A line is stored once, in
+    forward direction, and may be spelled either way round, so completing it
+    is detected from whichever of its cells is filled last and never needs
+    deduplicating. `checks` is the detection table: for a cell and the letter
+    placed on it, the other cells of each line and the letters they need.
+    For three-letter words such as SOS an entry is flattened to
+    (cell, letter, cell, letter, line id); otherwise it is
+    (cells, letters, line id).
+    """
+    rows: int
+    cols: int
+    word: str
+    lines: tuple        # line id -> flat cells in order
+    coords: tuple       # line id -> ((r, c), ...)
+    checks: tuple       # cell -> {letter: (entry, ...)}
+
+    def completed(self, labels, cell: int, letter: str) -> list:
+        """Ids of the lines that placing `letter` on `cell` completes, given the other labels."""
+        entries = self.checks[cell].get(letter, ())
+        if len(self.word) == 3:
+            return [lid for a, la, b, lb, lid in entries if labels[a] == la and labels[b] == lb]
+        return [lid for others, letters, lid in entries
+                if all(labels[other] == need for other, need in zip(others, letters))]
+
+    def threats(self, labels, cell: int, letter: str) -> list:
+        """(cell, letter) moves that would complete a line through `cell` with `letter` on it.
+
+        Only the other cells' labels are read, so this works before or after
+        the letter is placed.
+        """
+        threats = []
+        if len(self.word) == 3:
+            for a, la, b, lb, _ in self.checks[cell].get(letter, ()):
+                x, y = labels[a], labels[b]
+                if x == la:
+                    if y == "":
+                        threats.append((b, lb))
+                elif x == "" and y == lb:
+                    threats.append((a, la))
+            return threats
+        for others, letters, _ in self.checks[cell].get(letter, ()):
+            missing = None
+            for other, need in zip(others, letters):
+                label = labels[other]
+                if label != need:
+                    if label or missing is not None:
+                        break
+                    missing = (other, need)
+            else:
+                if missing is not None:
+                    threats.append(missing)
+        return threats
+
+
+def board_shape(board_size) -> tuple:
+    """(rows, cols) from a board size given as one int (square) or a (rows, cols) pair."""
+    if isinstance(board_size, (tuple, list)):
+        rows, cols = (int(n) for n in board_size)
+    else:
+        rows = cols = int(board_size)
+    assert rows > 0 and cols > 0, "the board needs at least one row and column"
+    return rows, cols
+
+
+def line_index(rows: int, cols: int | None = None, word: str = "SOS") -> LineIndex:
+    return _line_index(rows, rows if cols is None else cols, word)
+
+
+@lru_cache(maxsize=None)
+def _line_index(rows: int, cols: int, word: str) -> LineIndex:
+    length = len(word)
+    assert length >= 2, "the pattern word needs at least two letters"
+    readings = {word, word[::-1]}
+    lines = []
+    checks = [{letter: [] for letter in word} for _ in range(rows * cols)]
+    for r in range(rows):
+        for c in range(cols):
+            for dr, dc in SOSGame.DIRECTIONS[1::2]:
+                r2, c2 = r + (length - 1)*dr, c + (length - 1)*dc
+                if not (0 <= r2 < rows and 0 <= c2 < cols):
+                    continue
+                cells = tuple((r + k*dr)*cols + c + k*dc for k in range(length))
+                lid = len(lines)
+                lines.append(cells)
+                for reading in readings:
+                    for k, cell in enumerate(cells):
+                        others = cells[:k] + cells[k + 1:]
+                        letters = reading[:k] + reading[k + 1:]
+                        if length == 3:
+                            entry = (others[0], letters[0], others[1], letters[1], lid)
+                        else:
+                            entry = (others, tuple(letters), lid)
+                        checks[cell][reading[k]].append(entry)
+    coords = tuple(tuple(divmod(cell, cols) for cell in line) for line in lines)
+    return LineIndex(
+        rows=rows,
+        cols=cols,
+        word=word,
+        lines=tuple(lines),
+        coords=coords,
+        checks=tuple({letter: tuple(entries) for letter, entries in cell.items()} for cell in checks),
+    )
+
+
+class ListBoard:
+    """Board stored as a flat list of cell labels, checked through the shared LineIndex."""
+    def __init__(self, lines: LineIndex):
+        self.height = lines.rows
+        self.width = lines.cols
+        self.labels = [""] * (lines.rows * lines.cols)
+        self._set_lines(lines)
+
+    def _set_lines(self, lines: LineIndex):
+        self._lines = lines
+        self._coords = lines.coords
+        # three-letter words are checked inline, see find_new_sos
+        self._triples = lines.checks if len(lines.word) == 3 else None
+
+    def __getstate__(self):
+        return {"height": self.height, "width": self.width, "word": self._lines.word, "labels": self.labels}
+
+    def __setstate__(self, state):
+        self.height, self.width, self.labels = state["height"], state["width"], state["labels"]
+        self._set_lines(line_index(self.height, self.width, state["word"]))
+
+    def rows(self):
+        labels, width = self.labels, self.width
+        return [
+            [Move(r, c, labels[r*width + c]) for c in range(width)]
+            for r in range(self.height)
+        ]
+
+    def label(self, cell: int) -> str:
+        return self.labels[cell]
+
+    def place(self, cell: int, letter: str):
+        self.labels[cell] = letter
+
+    def remove(self, cell: int):
+        self.labels[cell] = ""
+
+    def copy(self):
+        board = ListBoard.__new__(ListBoard)
+        board.height = self.height
+        board.width = self.width
+        board.labels = self.labels[:]
+        board._lines = self._lines
+        board._coords = self._coords
+        board._triples = self._triples
+        return board
+
+    def threats(self, cell: int, letter: str) -> list:
+        return self._lines.threats(self.labels, cell, letter)
+
+    def find_new_sos(self, cell: int, letter: str):
+        coords = self._coords
+        if self._triples is None:
+            return [coords[lid] for lid in self._lines.completed(self.labels, cell, letter)]
+        labels = self.labels
+        return [coords[lid] for a, la, b, lb, lid in self._triples[cell].get(letter, ())
+                if labels[a] == la and labels[b] == lb]
+
+
+class BitBoard:
+    """Board packed into two integers: one bit per cell for S, one for O.
+
+    Each row gets two spare bit columns and the grid starts two spare rows in,
+    so any cell up to two steps off the board maps onto a bit that is always
+    zero. A check shifts a small window around the cell out of each mask once
+    and tests it against precomputed direction masks, with no bounds tests;
+    a per-cell window of the real cells tells empty cells from the padding.
+    Only the word SOS is supported.
+    """
+    __slots__ = ("height", "width", "s_bits", "o_bits", "_tables")
+
+    def __init__(self, lines: LineIndex):
+        assert lines.word == "SOS", "BitBoard only detects the word SOS"
+        self.height = lines.rows
+        self.width = lines.cols
+        self.s_bits = 0
+        self.o_bits = 0
+        self._tables = _bitboard_tables(lines.rows, lines.cols)
+
+    def __getstate__(self):
+        return self.height, self.width, self.s_bits, self.o_bits
+
+    def __setstate__(self, state):
+        self.height, self.width, self.s_bits, self.o_bits = state
+        self._tables = _bitboard_tables(self.height, self.width)
+
+    def rows(self):
+        width = self.width
+        return [
+            [Move(r, c, self.label(r*width + c)) for c in range(width)]
+            for r in range(self.height)
+        ]
+
+    def label(self, cell: int) -> str:
+        i = self._tables.bits[cell]
+        if (self.s_bits >> i) & 1:
+            return "S"
+        if (self.o_bits >> i) & 1:
+            return "O"
+        return ""
+
+    def place(self, cell: int, letter: str):
+        bit = 1 << self._tables.bits[cell]
+        if letter == "S":
+            self.s_bits |= bit
+        else:
+            self.o_bits |= bit
+
+    def remove(self, cell: int):
+        bit = 1 << self._tables.bits[cell]
+        self.s_bits &= ~bit
+        self.o_bits &= ~bit
+
+    def copy(self):
+        board = BitBoard.__new__(BitBoard)
+        board.height = self.height
+        board.width = self.width
+        board.s_bits = self.s_bits
+        board.o_bits = self.o_bits
+        board._tables = self._tables
+        return board
+
+    def _windows(self, cell: int):
+        """S, O and empty-cell bits around cell, the cell itself at bit tables.centre."""
+        tables = self._tables
+        shift = tables.bits[cell] - tables.centre
+        s_window = (self.s_bits >> shift) & tables.window
+        o_window = (self.o_bits >> shift) & tables.window
+        return s_window, o_window, tables.open[cell] & ~(s_window | o_window)
+
+    def threats(self, cell: int, letter: str) -> list:
+        s_window, o_window, empty = self._windows(cell)
+        threats = []
+        if letter == "S":
+            for near, far, step in self._tables.ends:
+                if o_window & near:
+                    if empty & far:
+                        threats.append((cell + 2*step, "S"))
+                elif empty & near and s_window & far:
+                    threats.append((cell + step, "O"))
+        elif letter == "O":
+            for back, ahead, step, _, _, _ in self._tables.middles:
+                if s_window & back:
+                    if empty & ahead:
+                        threats.append((cell + step, "S"))
+                elif empty & back and s_window & ahead:
+                    threats.append((cell - step, "S"))
+        return threats
+
+    def find_new_sos(self, cell: int, letter: str):
+        """The lines completed, as ListBoard returns them: in line index order, each in forward order."""
+        s_window, o_window, _ = self._windows(cell)
+        width = self.width
+        r, c = divmod(cell, width)
+        found = []
+        if letter == "O":
+            for back, ahead, step, dr, dc, rank in self._tables.middles:
+                if s_window & back and s_window & ahead:
+                    found.append(((cell - step) * 4 + rank, ((r - dr, c - dc), (r, c), (r + dr, c + dc))))
+        elif letter == "S":
+            for near, far, step, dr, dc, rank in self._tables.spans:
+                if o_window & near and s_window & far:
+                    if rank < 0:
+                        # a backward direction: the line starts at its far end
+                        found.append(((cell + 2*step) * 4 + ~rank, ((r + 2*dr, c + 2*dc), (r + dr, c + dc), (r, c))))
+                    else:
+                        found.append((cell * 4 + rank, ((r, c), (r + dr, c + dc), (r + 2*dr, c + 2*dc))))
+        if len(found) > 1:
+            found.sort()
+        return [line for _, line in found]
+
+
+class _BitTables(NamedTuple):
+    """Masks shared by every BitBoard of one shape."""
+    bits: tuple         # cell -> bit index
+    open: tuple         # cell -> bits of the real cells in its window
+    window: int         # mask of the window bits
+    centre: int         # bit of the cell itself within its window
+    ends: tuple         # S on the cell: (next bit, bit after, cell step) per direction
+    middles: tuple      # O on the cell: (bit behind, bit ahead, cell step, dr, dc, rank) per forward axis
+    spans: tuple        # ends with (dr, dc, rank) for find_new_sos; rank is ~rank of the reverse axis
+                        # for backward directions, and orders lines through one start cell as LineIndex does
+
+
+@lru_cache(maxsize=None)
+def _bitboard_tables(rows: int, cols: int) -> _BitTables:
+    stride = cols + 2
+    centre = 2 * (stride + 1)
+    bits = tuple((r + 2) * stride + c + 2 for r in range(rows) for c in range(cols))
+    real = 0
+    for i in bits:
+        real |= 1 << i
+    window = (1 << (2 * centre + 1)) - 1
+    opened = tuple((real >> (i - centre)) & window for i in bits)
+    ends, spans, middles = [], [], []
+    forward = SOSGame.DIRECTIONS[1::2]
+    for dr, dc in SOSGame.DIRECTIONS:
+        d = dr * stride + dc
+        near, far = 1 << (centre + d), 1 << (centre + 2 * d)
+        step = dr * cols + dc
+        rank = forward.index((dr, dc)) if (dr, dc) in forward else ~forward.index((-dr, -dc))
+        ends.append((near, far, step))
+        spans.append((near, far, step, dr, dc, rank))
+        if rank >= 0:
+            middles.append((1 << (centre - d), 1 << (centre + d), step, dr, dc, rank))
+    return _BitTables(bits, opened, window, centre, tuple(ends), tuple(middles), tuple(spans))
+
+
+BOARD_BACKENDS = {
+    "list": ListBoard,
+    "bitboard": BitBoard,
+}
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(cells: int, letters: tuple = ("S", "O")):
+    """Random 64-bit keys per (cell, letter), fixed per board size so hashes are stable."""
+    rng = random.Random(cells)
+    return tuple({letter: rng.getrandbits(64) for letter in letters} for _ in range(cells))
+
+
+@lru_cache(maxsize=None)
+def cell_symmetries(rows: int, cols: int | None = None) -> tuple:
+    """The rotations and reflections of the board as flat-cell permutations.
+
+    Entry s maps each cell to where symmetry s sends it; entry 0 is the
+    identity. A square board has 8, a rectangular one the 4 that keep its
+    shape. DIRECTIONS is closed under all of them, so they preserve lines.
+    """
+    cols = rows if cols is None else cols
+    m, n = rows - 1, cols - 1
+    if rows == cols:
+        transforms = (
+            lambda r, c: (r, c), lambda r, c: (c, n - r), lambda r, c: (n - r, n - c), lambda r, c: (n - c, r),
+            lambda r, c: (r, n - c), lambda r, c: (n - r, c), lambda r, c: (c, r), lambda r, c: (n - c, n - r),
+        )
+    else:
+        transforms = (
+            lambda r, c: (r, c), lambda r, c: (m - r, n - c), lambda r, c: (r, n - c), lambda r, c: (m - r, c),
+        )
+    cells = [divmod(cell, cols) for cell in range(rows * cols)]
+    return tuple(
+        tuple(r2 * cols + c2 for r2, c2 in (transform(r, c) for r, c in cells))
+        for transform in transforms
+    )
+
+
+@lru_cache(maxsize=None)
+def cell_moves(rows: int, cols: int | None = None, letters: tuple = ("S", "O")):
+    """cell -> a Move per letter, shared so move generation allocates nothing."""
+    cols = rows if cols is None else cols
+    return tuple(tuple(Move(r, c, letter) for letter in letters) for r in range(rows) for c in range(cols))
+
+
+@lru_cache(maxsize=None)
+def symmetric_zobrist_keys(rows: int, cols: int | None = None, letters: tuple = ("S", "O")):
+    """Per cell and letter, the Zobrist key it adds to each symmetric image of the board."""
+    cols = rows if cols is None else cols
+    zobrist = zobrist_keys(rows * cols, letters)
+    symmetries = cell_symmetries(rows, cols)
+    return tuple(
+        {letter: tuple(zobrist[perm[cell]][letter] for perm in symmetries) for letter in letters}
+        for cell in range(rows * cols)
+    )
+
 
 class SOSGame:
     DIRECTIONS = [
@@ -28,61 +417,139 @@ class SOSGame:
         (-1, -1), (1, 1),
         (-1, 1), (1, -1),
         ]
-    def __init__(self, players=DEFAULT_PLAYERS, board_size=BOARD_SIZE, mode: str = "simple"):
+    _instrumented = ()      # names of per-instance timing wrappers, see instrument.py
+    def __init__(self, players=DEFAULT_PLAYERS, board_size=BOARD_SIZE, mode: str = "simple",
+                 backend: str = "list", word: str = "SOS"):
+        """board_size is an int for a square board or (rows, cols); any number of
+        players take turns, and a line spelling `word` either way round scores."""
         assert mode in {"simple", "general"}, "mode must be 'simple' or 'general'"
-        
-        self._players = cycle(players)
+        assert backend in BOARD_BACKENDS, f"backend must be one of {sorted(BOARD_BACKENDS)}"
+        assert len(players) >= 1, "at least one player is needed"
+        assert len(word) >= 2 and word.isalpha(), "word must be two or more letters"
+
         self.players = players
         self.mode = mode
         self.board_size = board_size
-        self.current_player = next(self._players)
+        self.rows, self.cols = board_shape(board_size)
+        self.word = word
+        self.letters = tuple(dict.fromkeys(word))
+        self.backend = backend
+        self._turn = 0
         self.winner_combo=[]
-        self._current_moves = [
-            [Move(r, c) for c in range(self.board_size)]
-            for r in range(self.board_size)
-        ]
+        self._board = None
         self._has_winner = False
         self._game_over = False
         self._winning_combos = []
         self.winner_label = None
         self.scores = {p.label: 0 for p in players}
-        self._seen_sos = set()
         self.last_new_sos = []
+        self._empty_count = 0
+        self._empty = set()
+        self._threats = {}
+        self._lines = None
+        self._moves = ()
+        self._letter_index = {letter: i for i, letter in enumerate(self.letters)}
+        self._zobrist = ()
+        self._sym_zobrist = ()
+        self._key = 0
+        self._sym_keys = None       # per symmetry, only while track_symmetries() is on
+        self._leader = None
+        self._leader_score = 0
+        self._leader_shared = True
+        self._history = []
 
         self._setup_board()
 
     
 
     def _setup_board(self):
-        self._current_moves = [
-            [Move(row, col) for col in range(self.board_size)]
-            for row in range(self.board_size)
-        ]
+        rows, cols = self.rows, self.cols
+        cells = rows * cols
+        self._load_tables()
+        self._empty_count = cells
+        self._board = BOARD_BACKENDS[self.backend](self._lines)
+        # empty cells and {(cell, letter): SOS it would complete}, kept up to date per move
+        self._empty = set(range(cells))
+        self._threats = {}
+        self._key = 0
+        if self._sym_keys is not None:
+            self._sym_keys = (0,) * len(cell_symmetries(rows, cols))
+
+    # derived from the shape and word alone; pickles leave them out
+    _TABLES = ("_lines", "_moves", "_zobrist", "_sym_zobrist", "_winning_combos")
+
+    def _load_tables(self):
+        rows, cols = self.rows, self.cols
+        # the word is compiled into the shared line index once per board shape
+        self._lines = line_index(rows, cols, self.word)
+        self._moves = cell_moves(rows, cols, self.letters)
+        self._zobrist = zobrist_keys(rows * cols, self.letters)
+        self._sym_zobrist = symmetric_zobrist_keys(rows, cols, self.letters)
         self._winning_combos = self._get_winning_combos()
-        
+
+    def __getstate__(self):
+        """Everything but the shared tables, which __setstate__ looks up again."""
+        state = self.__dict__.copy()
+        for name in self._TABLES + self._instrumented:
+            del state[name]
+        state.pop("_instrumented", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._load_tables()
+
+    @property
+    def current_player(self) -> Player:
+        return self.players[self._turn]
+
+    @property
+    def _current_moves(self):
+        return self._board.rows()
+
     def _get_winning_combos(self):
-        rows = [
-            [(move.row, move.col) for move in row]
-            for row in self._current_moves
-        ]
-        columns = [list(col) for col in zip(*rows)]
-        first_diagonal = [row[i] for i, row in enumerate(rows)]
-        second_diagonal = [col[j] for j, col in enumerate(reversed(columns))]
+        n_rows, n_cols = self.rows, self.cols
+        rows = [[(r, c) for c in range(n_cols)] for r in range(n_rows)]
+        columns = [[(r, c) for r in range(n_rows)] for c in range(n_cols)]
+        length = min(n_rows, n_cols)
+        first_diagonal = [(i, i) for i in range(length)]
+        second_diagonal = [(i, n_cols - 1 - i) for i in range(length)]
         return rows + columns + [first_diagonal, second_diagonal]
     def is_valid_move(self, move):
         if self._game_over or (self._has_winner and self.mode == "simple"):
             return False
+        if move.label not in self.letters:
+            return False
         row, col = move.row, move.col
-        move_was_not_played = self._current_moves[row][col].label == ""
+        if not self._in_bounds(row, col):
+            return False
+        move_was_not_played = row*self.cols + col in self._empty
         no_winner = not self._has_winner
         return no_winner and move_was_not_played
     def process_move(self, move):
         if not self.is_valid_move(move):
             self.last_new_sos = []
             return []
-        r, c, ch = move
-        self._current_moves[r][c] = move
-        new_sos = self._find_new_sos_from_move(move)
+        cell = move.row * self.cols + move.col
+        threats = self._threats
+        at_cell = [threats.pop((cell, letter), 0) for letter in self.letters]
+        self._board.place(cell, move.label)
+        self._empty.discard(cell)
+        self._empty_count -= 1
+        for threat in self._new_threats(cell, move.label):
+            threats[threat] = threats.get(threat, 0) + 1
+        self._key ^= self._zobrist[cell][move.label]
+        if self._sym_keys is not None:
+            self._sym_keys = tuple(map(xor, self._sym_keys, self._sym_zobrist[cell][move.label]))
+        # the threat count is the number of lines the move completes, so most moves skip the search
+        new_sos = self._find_new_sos_from_move(move) if at_cell[self._letter_index[move.label]] else []
+        # the result and scores below are still those from before the move;
+        # tuple.__new__ skips NamedTuple's slower argument handling
+        self._history.append(tuple.__new__(HistoryEntry, (
+            move, self._turn, new_sos, self._has_winner, self._game_over, self.winner_label,
+            self.winner_combo, self.last_new_sos, self._leader, self._leader_score,
+            self._leader_shared, at_cell,
+        )))
         self.last_new_sos = new_sos
         if new_sos:
             if self.mode == "simple":
@@ -91,18 +558,101 @@ class SOSGame:
                 self.winner_label = self.current_player.label
                 self.winner_combo = new_sos[-1]
             else:
-                self.scores[self.current_player.label] += len(new_sos)
+                self._add_score(self.current_player.label, len(new_sos))
         if self.mode == "general":
-            if all(m.label for row in self._current_moves for m in row):
+            if self._empty_count == 0:
                 self._game_over = True
-                sorted_scores = sorted(self.scores.items(), key=lambda kv: kv[1], reverse=True)
-                if len(sorted_scores) >= 2 and sorted_scores[0][1] > sorted_scores[1][1]:
+                if not self._leader_shared:
                     self._has_winner = True
-                    self.winner_label = sorted_scores[0][0]
+                    self.winner_label = self._leader
                 else:
                     self._has_winner = False
                     self.winner_label = None
+        elif self._empty_count == 0:
+            # a full board without an SOS is a finished, tied game
+            self._game_over = True
         return new_sos
+    def undo_move(self):
+        """Take back the last processed move, restoring board, scores, result and turn.
+
+        Returns the undone Move, or None when there is nothing to undo.
+        """
+        if not self._history:
+            return None
+        (move, self._turn, made, self._has_winner, self._game_over, self.winner_label,
+         self.winner_combo, last_new_sos, self._leader, self._leader_score,
+         self._leader_shared, at_cell) = self._history.pop()
+        if self.mode == "general":
+            self.scores[self.current_player.label] -= len(made)
+        self.last_new_sos = last_new_sos
+        cell = move.row * self.cols + move.col
+        threats = self._threats
+        for threat in self._new_threats(cell, move.label):
+            count = threats[threat] - 1
+            if count:
+                threats[threat] = count
+            else:
+                del threats[threat]
+        for letter, count in zip(self.letters, at_cell):
+            if count:
+                threats[cell, letter] = count
+        self._board.remove(cell)
+        self._empty.add(cell)
+        self._empty_count += 1
+        self._key ^= self._zobrist[cell][move.label]
+        if self._sym_keys is not None:
+            self._sym_keys = tuple(map(xor, self._sym_keys, self._sym_zobrist[cell][move.label]))
+        return move
+    def _new_threats(self, cell: int, letter: str):
+        """(cell, letter) moves that complete a line through `cell` now that `letter` is on it.
+
+        Before the letter went down, any line through the empty cell could
+        only have been completed there, so these are the only new ones.
+        """
+        return self._board.threats(cell, letter)
+    def legal_moves(self):
+        """Iterate over every valid move without scanning the board."""
+        if self._game_over:
+            return
+        moves = self._moves
+        for cell in tuple(self._empty):
+            yield from moves[cell]
+    def scoring_moves(self):
+        """Iterate over the valid moves that would complete at least one SOS."""
+        if self._game_over:
+            return
+        moves, index = self._moves, self._letter_index
+        for cell, letter in tuple(self._threats):
+            yield moves[cell][index[letter]]
+    def sos_count(self, move) -> int:
+        """How many SOS lines the move would complete; 0 for an occupied or off-board cell."""
+        if not self._in_bounds(move.row, move.col):
+            return 0
+        return self._threats.get((move.row * self.cols + move.col, move.label), 0)
+    def push(self, move):
+        """Play a move and pass the turn unless the game ended, as the GUI does.
+
+        Raises ValueError for an invalid move so push/pop always stay paired.
+        """
+        if not self.is_valid_move(move):
+            raise ValueError(f"invalid move {move}")
+        new_sos = self.process_move(move)
+        if not self._game_over:
+            self.toggle_player()
+        return new_sos
+    def pop(self):
+        """Undo the last push (or process_move); the mover is to play again."""
+        return self.undo_move()
+    def _add_score(self, label: str, points: int):
+        # scores only grow between undos, and undo_move restores the saved leader
+        score = self.scores[label] + points
+        self.scores[label] = score
+        if score > self._leader_score:
+            self._leader = label
+            self._leader_score = score
+            self._leader_shared = False
+        elif score == self._leader_score and label != self._leader:
+            self._leader_shared = True
     def is_over(self) -> bool:
         return self._game_over
     
@@ -110,61 +660,92 @@ class SOSGame:
         return self._has_winner
     def is_tied(self):
         if self.mode == "simple":
-            full = all(m.label for row in self._current_moves for m in row)
-            return full and not self._has_winner
+            return self._empty_count == 0 and not self._has_winner
         else:
-            if not self._game_over:
-                return False
-            vals = list(self.scores.values())
-            return len(vals) >= 2 and vals[0] == vals[1]
+            return self._game_over and self._leader_shared
 
         
+    def key(self) -> int:
+        """Zobrist hash of the board, updated with every move and undo.
+
+        Only the letters on the board are hashed: the turn, scores and
+        history are left out, so transposed move orders share a key.
+        """
+        return self._key
+    def track_symmetries(self, on: bool = True) -> bool:
+        """Keep the key of every symmetric image up to date per move; returns the old setting.
+
+        Off by default, so plain games only pay for key(). Search code that
+        asks for canonical keys at every node turns it on for the search;
+        otherwise symmetric_keys() is computed from the board when asked.
+        """
+        was_on = self._sym_keys is not None
+        if on and not was_on:
+            self._sym_keys = self.symmetric_keys()
+        elif not on:
+            self._sym_keys = None
+        return was_on
+    def symmetric_keys(self) -> tuple:
+        """key() of each image of the board under cell_symmetries(), in that order."""
+        if self._sym_keys is not None:
+            return self._sym_keys
+        keys = [0] * len(cell_symmetries(self.rows, self.cols))
+        sym_zobrist, board, empty = self._sym_zobrist, self._board, self._empty
+        for cell in range(self.rows * self.cols):
+            if cell not in empty:
+                for s, k in enumerate(sym_zobrist[cell][board.label(cell)]):
+                    keys[s] ^= k
+        return tuple(keys)
+    def canonical_key(self) -> int:
+        """Key shared by all rotations and reflections of the board.
+
+        With track_symmetries() on this is only a min() over 8 ints (4 on
+        rectangles); otherwise the board is hashed under each symmetry first.
+        """
+        return min(self.symmetric_keys())
+    def canonical(self):
+        """(canonical_key(), s): index s into cell_symmetries() maps this board onto the canonical one."""
+        keys = self.symmetric_keys()
+        key = min(keys)
+        return key, keys.index(key)
+    def clone(self):
+        """An independent copy of the game, including its undo history."""
+        game = SOSGame.__new__(SOSGame)
+        game.__dict__.update(self.__dict__)
+        game.scores = dict(self.scores)
+        game._history = list(self._history)
+        game._board = self._board.copy()
+        game._empty = set(self._empty)
+        game._threats = dict(self._threats)
+        for name in self._instrumented:
+            # timing wrappers are bound to this game; the copy runs unwrapped
+            del game.__dict__[name]
+        game.__dict__.pop("_instrumented", None)
+        return game
     def toggle_player(self):
-        self.current_player = next(self._players)
-    def reset_game(self, *, mode: str | None = None, board_size: int | None = None):
+        self._turn = (self._turn + 1) % len(self.players)
+    def reset_game(self, *, mode: str | None = None, board_size=None):
         if mode is not None:
             assert mode in {"simple", "general"}
             self.mode = mode
         if board_size is not None:
-            self.board_size = int(board_size)
-        self._current_moves = [
-            [Move(r, c) for c in range(self.board_size)]
-            for r in range(self.board_size)
-        ]
+            self.rows, self.cols = board_shape(board_size)
+            self.board_size = tuple(board_size) if isinstance(board_size, (tuple, list)) else int(board_size)
+        self._setup_board()
+        self._turn = 0
         self._has_winner = False
         self._game_over = False
         self.winner_combo = []
         self.winner_label = None
-        self._seen_sos.clear()
         self.last_new_sos = []
+        self._history.clear()
         self.scores = {p.label: 0 for p in self.players}
+        self._leader = None
+        self._leader_score = 0
+        self._leader_shared = True
     def _in_bounds(self, r: int, c: int) -> bool:
-        return 0 <= r < self.board_size and 0 <= c < self.board_size
+        return 0 <= r < self.rows and 0 <= c < self.cols
     def _cell_label(self, r: int, c: int) -> str:
-        return self._current_moves[r][c].label
+        return self._board.label(r*self.cols + c)
     def _find_new_sos_from_move(self, move: Move):
-        r, c, ch = move
-        new_triples = []
-        if ch == "O":
-            for dr, dc in self.DIRECTIONS:
-                r1, c1 = r - dr, c - dc
-                r2, c2 = r + dr, c + dc
-                if self._in_bounds(r1, c1) and self._in_bounds(r2, c2):
-                    if self._cell_label(r1, c1) == "S" and self._cell_label(r2, c2) == "S":
-                        triple = [(r1, c1), (r, c), (r2, c2)]
-                        key = frozenset(triple)
-                        if key not in self._seen_sos:
-                            self._seen_sos.add(key)
-                            new_triples.append(triple)
-        if ch == "S":
-            for dr, dc in self.DIRECTIONS:
-                r_mid, c_mid = r + dr, c + dc
-                r_end, c_end = r + 2*dr, c + 2*dc
-                if self._in_bounds(r_mid, c_mid) and self._in_bounds(r_end, c_end):
-                    if self._cell_label(r_mid, c_mid) == "O" and self._cell_label(r_end, c_end) == "S":
-                        triple = [(r, c), (r_mid, c_mid), (r_end, c_end)]
-                        key = frozenset(triple)
-                        if key not in self._seen_sos:
-                            self._seen_sos.add(key)
-                            new_triples.append(triple)
-        return new_triples
\ No newline at end of file
+        return self._board.find_new_sos(move.row*self.cols + move.col, move.label)
@@ -0,0 +1,166 @@
+"""Opt-in timing and profiling for SOSGame and SOSBoard.
+
+Nothing here touches the classes. instrument_game()/instrument_board() put
+timing wrappers on a single instance, and uninstrument() removes them, so
+games that are not instrumented run exactly the same code as before. Each
+wrapped method gets a call counter and a latency histogram with power-of-two
+buckets.
+
+    metrics = instrument_game(game)
+    ...
+    print(metrics.report())
+
+    with profile("session.prof"):
+        board.mainloop()
+"""
+import cProfile
+import io
+import pstats
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter_ns
+
+GAME_METHODS = {
+    "process_move": "game.process_move",
+    "undo_move": "game.undo_move",
+    "_find_new_sos_from_move": "game.find_new_sos",
+    "is_over": "game.is_over",
+    "has_winner": "game.has_winner",
+    "is_tied": "game.is_tied",
+}
+BOARD_METHODS = {
+    "create_board_grid": "gui.create_board_grid",
+    "_apply_move": "gui.apply_move",
+    "_update_cell": "gui.update_cell",
+    "_draw_strikes": "gui.draw_strikes",
+    "_highlight_cells": "gui.highlight_cells",
+    "_update_display": "gui.update_display",
+}
+
+
+class Histogram:
+    """Call count and latency distribution; bucket b holds calls under 2**b ns."""
+    __slots__ = ("count", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * 64
+
+    def add(self, ns: int):
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[ns.bit_length()] += 1
+
+    def percentile(self, fraction: float) -> int:
+        """Upper bound in ns of the bucket holding the given fraction of calls."""
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return 1 << bucket
+        return 0
+
+    def as_dict(self) -> dict:
+        mean = self.total_ns / self.count if self.count else 0
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": mean / 1e3,
+            "p50_us": self.percentile(0.5) / 1e3,
+            "p99_us": self.percentile(0.99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+class Metrics:
+    """Histograms by name, shared by every instance instrumented with it."""
+    def __init__(self):
+        self.histograms = {}
+
+    def histogram(self, name: str) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def as_dict(self) -> dict:
+        return {name: hist.as_dict() for name, hist in sorted(self.histograms.items())}
+
+    def reset(self):
+        self.histograms.clear()
+
+    def report(self) -> str:
+        lines = [f"{'name':26} {'calls':>9} {'total ms':>10} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'max us':>9}"]
+        for name, row in self.as_dict().items():
+            lines.append(f"{name:26} {row['count']:9} {row['total_ms']:10.2f} {row['mean_us']:9.2f} "
+                         f"{row['p50_us']:9.2f} {row['p99_us']:9.2f} {row['max_us']:9.2f}")
+        return "\n".join(lines)
+
+
+def _wrap(obj, methods: dict, metrics: Metrics):
+    wrapped = list(getattr(obj, "_instrumented", ()))
+    for attr, name in methods.items():
+        if attr in wrapped:
+            continue
+        method = getattr(obj, attr)
+        hist = metrics.histogram(name)
+
+        @wraps(method)
+        def timed(*args, _method=method, _hist=hist, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                _hist.add(perf_counter_ns() - start)
+        setattr(obj, attr, timed)
+        wrapped.append(attr)
+    obj._instrumented = tuple(wrapped)
+    return metrics
+
+
+def instrument_game(game, metrics: Metrics | None = None) -> Metrics:
+    """Time move processing, SOS detection and end-of-game checks on this game."""
+    return _wrap(game, GAME_METHODS, metrics or Metrics())
+
+
+def instrument_board(board, metrics: Metrics | None = None) -> Metrics:
+    """Time the redraw paths of an SOSBoard, and its game's hot paths."""
+    metrics = metrics or Metrics()
+    instrument_game(board._game, metrics)
+    board.metrics = metrics     # games started later on the board are instrumented too
+    return _wrap(board, BOARD_METHODS, metrics)
+
+
+def uninstrument(obj):
+    """Remove the timing wrappers from an instrumented game or board."""
+    for attr in getattr(obj, "_instrumented", ()):
+        delattr(obj, attr)
+    obj.__dict__.pop("_instrumented", None)
+    game = obj.__dict__.get("_game")
+    if game is not None:
+        obj.metrics = None
+        uninstrument(game)
+
+
+@contextmanager
+def profile(path=None):
+    """Run the block under cProfile, dumping the stats to `path` if one is given."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+
+
+def profile_text(profiler: cProfile.Profile, sort: str = "cumulative", limit: int = 25) -> str:
+    """The top `limit` entries of a profile as pstats prints them."""
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
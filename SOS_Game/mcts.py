@@ -0,0 +1,253 @@
+"""Monte Carlo Tree Search player.
+
+Each iteration walks the tree with UCT, expands one new move (only
+SOS-completing moves where there are any), finishes the game with a quick playout that takes
+any SOS on offer and otherwise avoids setting one up, and backs the result
+up the path. Moves are played on the real game with push/pop, so no copies are
+made while searching.
+
+With workers > 1 the player searches root-parallel: every worker process
+grows its own tree from the same position with its own seed for the same
+time budget, and the root visit counts are summed before picking the most
+visited move. With a single worker the tree is kept between turns and the
+subtree under the moves actually played is reused.
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from game_logic import Move
+
+
+class Node:
+    __slots__ = ("move", "parent", "mover", "children", "untried", "visits", "wins")
+
+    def __init__(self, move=None, parent=None, mover=None):
+        self.move = move        # (cell, letter) that led here
+        self.parent = parent
+        self.mover = mover      # index of the player who made that move
+        self.children = {}
+        self.untried = None     # filled in on the first visit
+        self.visits = 0
+        self.wins = 0.0         # reward for `mover`
+
+    def best_child(self, exploration: float):
+        log_n = math.log(self.visits)
+        return max(
+            self.children.values(),
+            key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_n / child.visits),
+        )
+
+
+class _Search:
+    """One tree search over a game, moving it forward and back with push/pop."""
+    def __init__(self, game, exploration: float, rng: random.Random, root: Node | None = None):
+        self.game = game
+        self.exploration = exploration
+        self.rng = rng
+        self.cols = game.cols
+        self.letters = game.letters
+        self.board = game._board        # the game's own board, updated by push/pop
+        self.root = root or Node(mover=None)
+        self.iterations = 0
+        self.cancelled = False
+
+    def _push(self, cell: int, letter: str):
+        r, c = divmod(cell, self.cols)
+        self.game.push(Move(r, c, letter))
+
+    def _pop(self, cell: int):
+        self.game.pop()
+
+    def _open_moves(self):
+        """Untried moves for a new node, in pop order.
+
+        When an SOS can be completed only those moves are considered, which
+        is what lets the tree see at once that a move handing over an SOS is
+        bad. Otherwise moves setting one up for the opponent come last.
+        """
+        if self.game._threats:
+            return list(self.game._threats)
+        quiet, risky = [], []
+        for cell in sorted(self.game._empty):
+            for letter in self.letters:
+                if self._gives_away(cell, letter):
+                    risky.append((cell, letter))
+                else:
+                    quiet.append((cell, letter))
+        self.rng.shuffle(quiet)
+        self.rng.shuffle(risky)
+        return risky + quiet
+
+    def _gives_away(self, cell: int, letter: str) -> bool:
+        return bool(self.board.threats(cell, letter))
+
+    def _playout(self, played):
+        """Finish the game: complete an SOS whenever one is on offer, else play a random
+        empty cell with a letter that does not set up an SOS for the opponent."""
+        game, threats, letters = self.game, self.game._threats, self.letters
+        empty = sorted(game._empty)
+        self.rng.shuffle(empty)
+        while not game.is_over():
+            if threats:
+                move = next(iter(threats))
+            else:
+                while empty[-1] not in game._empty:
+                    empty.pop()
+                cell = empty.pop()
+                for letter in letters:
+                    if not self._gives_away(cell, letter):
+                        break
+                else:
+                    letter = self.rng.choice(letters)
+                move = (cell, letter)
+            self._push(*move)
+            played.append(move[0])
+
+    def _rewards(self):
+        game = self.game
+        players = game.players
+        if game.has_winner():
+            return [1.0 if p.label == game.winner_label else 0.0 for p in players]
+        return [1.0 / len(players)] * len(players)
+
+    def iterate(self):
+        game = self.game
+        node = self.root
+        played = []
+        # selection
+        while node.untried is not None and not node.untried and node.children:
+            node = node.best_child(self.exploration)
+            self._push(*node.move)
+            played.append(node.move[0])
+        # expansion
+        if not game.is_over():
+            if node.untried is None:
+                node.untried = self._open_moves()
+            if node.untried:
+                move = node.untried.pop()
+                mover = game._turn
+                self._push(*move)
+                played.append(move[0])
+                child = Node(move, node, mover)
+                node.children[move] = child
+                node = child
+        # playout
+        self._playout(played)
+        rewards = self._rewards()
+        for cell in reversed(played):
+            self._pop(cell)
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.mover is not None:
+                node.wins += rewards[node.mover]
+            node = node.parent
+        self.iterations += 1
+
+    def run(self, time_limit: float, iterations: int | None = None):
+        deadline = time.perf_counter() + time_limit
+        while True:
+            self.iterate()
+            if iterations is not None and self.iterations >= iterations:
+                break
+            if self.cancelled or time.perf_counter() >= deadline:
+                break
+        return self.root
+
+
+def _root_visits(game, time_limit: float, iterations: int | None, exploration: float, seed):
+    """Worker entry point: search a pickled game and return root child visit counts."""
+    search = _Search(game, exploration, random.Random(seed))
+    root = search.run(time_limit, iterations)
+    return {move: child.visits for move, child in root.children.items()}, search.iterations
+
+
+class MCTSPlayer:
+    """Computer player using UCT Monte Carlo Tree Search with a per-move time budget."""
+    def __init__(self, time_limit: float = 1.0, iterations: int | None = None,
+                 exploration: float = 1.4, workers: int = 1, seed=None):
+        self.time_limit = time_limit
+        self.iterations = iterations
+        self.exploration = exploration
+        self.workers = workers
+        self.last_iterations = 0
+        self._rng = random.Random(seed)
+        self._pool = None
+        self._root = None
+        self._root_moves = None     # the moves played to reach self._root
+        self._active = None
+
+    def choose_move(self, game) -> Move | None:
+        if game.is_over():
+            return None
+        if self.workers > 1:
+            visits = self._parallel_visits(game)
+        else:
+            search = self._active = _Search(game, self.exploration, self._rng, self._reuse(game))
+            root = search.run(self.time_limit, self.iterations)
+            self._active = None
+            visits = {move: child.visits for move, child in root.children.items()}
+            self.last_iterations = search.iterations
+            self._root = root
+            self._root_moves = [entry.move for entry in game._history]
+        cell, letter = max(visits, key=visits.get)
+        if self.workers == 1:
+            self._root = self._root.children[(cell, letter)]
+            self._root.parent = None
+        r, c = divmod(cell, game.cols)
+        move = Move(r, c, letter)
+        if self.workers == 1:
+            self._root_moves.append(move)
+        return move
+
+    def _reuse(self, game):
+        """The stored subtree for this position, if the moves since last turn are in the tree.
+
+        The game's history must extend the moves that led to the stored root,
+        and the moves since are followed in the order they were played, so
+        each node reached has the same movers as the game.
+        """
+        root, old = self._root, self._root_moves
+        self._root = self._root_moves = None
+        history = game._history
+        if root is None or len(history) < len(old):
+            return None
+        if any(entry.move != move for entry, move in zip(history, old)):
+            return None
+        cols = game.cols
+        for move in (entry.move for entry in history[len(old):]):
+            root = root.children.get((move.row * cols + move.col, move.label))
+            if root is None:
+                return None
+        root.parent = None
+        return root
+
+    def _parallel_visits(self, game):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [
+            self._pool.submit(_root_visits, game, self.time_limit, self.iterations,
+                              self.exploration, self._rng.getrandbits(32))
+            for _ in range(self.workers)
+        ]
+        visits = {}
+        self.last_iterations = 0
+        for future in futures:
+            counts, iterations = future.result()
+            self.last_iterations += iterations
+            for move, count in counts.items():
+                visits[move] = visits.get(move, 0) + count
+        return visits
+
+    def cancel(self):
+        """Ask a search running in another thread to stop after its current iteration."""
+        search = self._active
+        if search is not None:
+            search.cancelled = True
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,210 @@
+"""Compact binary game records.
+
+A record file is the magic bytes b"SOSREC", a format version byte, and then
+game records back to back:
+
+    board_size  u8
+    mode        u8      0 simple, 1 general
+    n_players   u8
+    n_moves     u16
+    players     n_players x (label, color), each a u8 length + UTF-8 bytes
+    moves       n_moves entries of cell << 1 | letter (S=0, O=1), where
+                cell = row * board_size + col; one byte per move on boards
+                up to 11x11, two little-endian bytes above that
+
+Files are only ever appended to, so a writer can add games to an existing
+dataset. The reader memory-maps the file and decodes one record at a time,
+which keeps memory flat however many games the file holds.
+
+    python -m records games.sosr --limit 5
+"""
+import argparse
+import mmap
+import struct
+from functools import lru_cache
+from typing import NamedTuple
+from game_logic import SOSGame, Player, Move
+
+MAGIC = b"SOSREC"
+VERSION = 1
+MODES = ("simple", "general")
+MAX_BOARD_SIZE = 181    # the largest board whose cells fit a two-byte entry
+
+_FILE_HEADER = MAGIC + bytes([VERSION])
+_RECORD_HEADER = struct.Struct("<BBBH")
+
+
+class GameRecord(NamedTuple):
+    board_size: int
+    mode: str
+    players: tuple
+    moves: tuple
+
+
+def _move_width(board_size: int) -> int:
+    return 1 if board_size * board_size * 2 <= 256 else 2
+
+
+@lru_cache(maxsize=None)
+def _move_table(board_size: int) -> tuple:
+    """Entry -> Move for every cell and letter, so decoding is a lookup per move."""
+    return tuple(Move(*divmod(entry >> 1, board_size), "SO"[entry & 1])
+                 for entry in range(board_size * board_size * 2))
+
+
+def _pack_text(text: str) -> bytes:
+    data = text.encode()
+    assert len(data) < 256, "player labels and colors must be under 256 bytes"
+    return bytes([len(data)]) + data
+
+
+def encode_record(record: GameRecord) -> bytes:
+    size = record.board_size
+    assert 0 < size <= MAX_BOARD_SIZE, f"board_size must be between 1 and {MAX_BOARD_SIZE}"
+    assert len(record.moves) <= 0xFFFF, "too many moves for one record"
+    parts = [_RECORD_HEADER.pack(size, MODES.index(record.mode), len(record.players), len(record.moves))]
+    for player in record.players:
+        parts.append(_pack_text(player.label))
+        parts.append(_pack_text(player.color))
+    entries = [(move.row * size + move.col) << 1 | (move.label == "O") for move in record.moves]
+    if _move_width(size) == 1:
+        parts.append(bytes(entries))
+    else:
+        parts.append(struct.pack(f"<{len(entries)}H", *entries))
+    return b"".join(parts)
+
+
+def record_from_game(game: SOSGame) -> GameRecord:
+    """The moves played so far in a game, in order."""
+    assert game.rows == game.cols and game.word == "SOS", "records hold square SOS games"
+    moves = tuple(entry.move for entry in game._history)
+    return GameRecord(game.board_size, game.mode, tuple(game.players), moves)
+
+
+class RecordWriter:
+    """Appends game records to a file, writing the file header if it is new."""
+    def __init__(self, path):
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_FILE_HEADER)
+        self.written = 0
+
+    def write(self, game: SOSGame):
+        self.write_record(record_from_game(game))
+
+    def write_record(self, record: GameRecord):
+        self._file.write(encode_record(record))
+        self.written += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _decode_records(data):
+    """Yield GameRecords from a buffer holding a whole record file."""
+    if data[:len(_FILE_HEADER)] != _FILE_HEADER:
+        raise ValueError("not an SOS record file, or an unsupported version")
+    pos, end = len(_FILE_HEADER), len(data)
+    while pos < end:
+        if pos + _RECORD_HEADER.size > end:
+            raise ValueError(f"truncated record header at byte {pos}")
+        size, mode, n_players, n_moves = _RECORD_HEADER.unpack_from(data, pos)
+        if not 0 < size <= MAX_BOARD_SIZE:
+            raise ValueError(f"bad board size {size} at byte {pos}")
+        if mode >= len(MODES):
+            raise ValueError(f"bad mode {mode} at byte {pos + 1}")
+        pos += _RECORD_HEADER.size
+        players = []
+        for _ in range(n_players):
+            fields = []
+            for _ in range(2):
+                if pos >= end or pos + 1 + data[pos] > end:
+                    raise ValueError(f"truncated player list at byte {pos}")
+                length = data[pos]
+                fields.append(bytes(data[pos + 1:pos + 1 + length]).decode())
+                pos += 1 + length
+            players.append(Player(*fields))
+        width = _move_width(size)
+        if pos + n_moves * width > end:
+            raise ValueError(f"truncated move list at byte {pos}")
+        if width == 1:
+            entries = data[pos:pos + n_moves]
+        else:
+            entries = struct.unpack_from(f"<{n_moves}H", data, pos)
+        table = _move_table(size)
+        if entries and max(entries) >= len(table):
+            raise ValueError(f"move off the board in the move list at byte {pos}")
+        pos += n_moves * width
+        moves = tuple(table[entry] for entry in entries)
+        yield GameRecord(size, MODES[mode], tuple(players), moves)
+
+
+def read_records(path):
+    """Stream the records of a file without reading it into memory."""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            raise ValueError("empty record file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from _decode_records(data)
+
+
+def replay(record: GameRecord, backend: str = "list") -> SOSGame:
+    """Play a record's moves through the engine; invalid moves raise ValueError."""
+    game = SOSGame(players=record.players, board_size=record.board_size, mode=record.mode, backend=backend)
+    for move in record.moves:
+        game.push(move)
+    return game
+
+
+def replay_file(path, backend: str = "list"):
+    """Yield every game in a record file as a replayed SOSGame."""
+    for record in read_records(path):
+        yield replay(record, backend)
+
+
+def to_text(record: GameRecord) -> str:
+    """Human-readable listing of a record: the moves in order, then the final board."""
+    game = SOSGame(players=record.players, board_size=record.board_size, mode=record.mode)
+    lines = [f"{record.board_size}x{record.board_size} {record.mode}, players "
+             + " ".join(p.label for p in record.players)]
+    for number, move in enumerate(record.moves, 1):
+        mover = game.current_player.label
+        made = game.push(move)
+        note = f"  +{len(made)} SOS" if made else ""
+        lines.append(f"{number:3}. {mover} {move.label} at ({move.row}, {move.col}){note}")
+    for row in game._current_moves:
+        lines.append(" ".join(move.label or "." for move in row))
+    if game.has_winner():
+        lines.append(f"winner {game.winner_label}")
+    elif game.is_over():
+        lines.append("tie")
+    else:
+        lines.append("unfinished")
+    lines.append("scores " + " ".join(f"{label}={score}" for label, score in game.scores.items()))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m records", description="Print SOS game records as text.")
+    parser.add_argument("path")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many games")
+    args = parser.parse_args(argv)
+    for number, record in enumerate(read_records(args.path)):
+        if args.limit is not None and number >= args.limit:
+            break
+        print(f"# game {number + 1}")
+        print(to_text(record))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Asyncio SOS game server.
+
+    python -m server serve --port 8765
+    python -m server loadtest --matches 1000 --connections 50
+
+Clients speak newline-delimited JSON over TCP. Every request is an object
+with an "op"; replies and updates are objects with a "type".
+
+    {"op": "new", "size": 6, "mode": "general"}   -> {"type": "joined", "match", "seat", "player", ...}
+    {"op": "join", "match": 3}                     -> "joined" for the next free seat; a connection
+                                                      may hold several seats of one match
+    {"op": "watch", "match": 3}                    -> "joined" with seat null
+    {"op": "move", "match": 3, "row": 0, "col": 1, "letter": "S"}
+    {"op": "leave", "match": 3}
+
+"joined" carries the moves played so far. After that, every player and
+watcher in the match gets one "move" update per move: the move, the SOS
+lines it made, the scores, whose turn it is and the result. No full boards
+are sent. Moves are checked by the engine, and rejected requests get an
+"error" reply. A match is dropped once nobody is connected to it. A client
+that stops reading is disconnected once MAX_WRITE_BUFFER bytes of updates
+are waiting for it, so one slow watcher cannot grow the server's memory. A
+request line longer than MAX_REQUEST_BYTES gets an error and the connection
+is closed.
+
+loadtest opens --connections client connections (to --host/--port, or to a
+server started in the same process) and plays --matches random games spread
+over them, all in progress at once. It reports moves per second and
+round-trip latency percentiles.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from game_logic import SOSGame, Move, DEFAULT_PLAYERS
+
+MAX_BOARD_SIZE = 40
+PORT = 8765
+MAX_WRITE_BUFFER = 1 << 20      # bytes of unsent updates before a client is dropped as too slow
+MAX_REQUEST_BYTES = 1 << 16     # longest request line; a longer one closes the connection
+
+
+class Match:
+    def __init__(self, match_id: int, size: int, mode: str):
+        self.id = match_id
+        self.game = SOSGame(players=DEFAULT_PLAYERS, board_size=size, mode=mode)
+        self.seats = [None] * len(DEFAULT_PLAYERS)
+        self.watchers = set()
+
+    def connections(self):
+        return {conn for conn in self.seats if conn is not None} | self.watchers
+
+    def update(self, move: Move, mover: str, new_sos) -> dict:
+        game = self.game
+        return {
+            "type": "move",
+            "match": self.id,
+            "seq": len(game._history),
+            "player": mover,
+            "row": move.row,
+            "col": move.col,
+            "letter": move.label,
+            "sos": new_sos,
+            "scores": game.scores,
+            "turn": None if game.is_over() else game.current_player.label,
+            "over": game.is_over(),
+            "winner": game.winner_label,
+        }
+
+
+class Connection:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.matches = set()
+        self.dropped = False
+
+    def send(self, message: dict):
+        self.write(encode(message))
+
+    def write(self, data: bytes):
+        """Queue data for the client, dropping the connection if it has stopped reading."""
+        if self.dropped:
+            return
+        transport = self.writer.transport
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            # its handler sees the connection close and leaves its matches
+            self.dropped = True
+            transport.abort()
+            return
+        self.writer.write(data)
+
+
+def encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class RequestError(Exception):
+    pass
+
+
+def _is_int(value) -> bool:
+    # JSON true/false arrive as bool, which is an int subclass
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class SOSServer:
+    """Hosts any number of matches in one event loop."""
+    def __init__(self):
+        self.matches = {}
+        self.moves = 0
+        self._next_id = 1
+
+    async def start(self, host: str = "127.0.0.1", port: int = PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST_BYTES)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = Connection(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:      # the line overran the reader's limit
+                    conn.send({"type": "error", "message": f"requests are limited to {MAX_REQUEST_BYTES} bytes"})
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise RequestError("requests must be JSON objects")
+                    self.dispatch(conn, request)
+                except (ValueError, RequestError) as exc:
+                    conn.send({"type": "error", "message": str(exc)})
+                except RecursionError:
+                    conn.send({"type": "error", "message": "request is nested too deeply"})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for match_id in list(conn.matches):
+                self._leave(conn, match_id)
+            writer.close()
+
+    def dispatch(self, conn: Connection, request: dict):
+        op = request.get("op")
+        if op == "new":
+            size = request.get("size", 6)
+            mode = request.get("mode", "general")
+            if not _is_int(size) or not 3 <= size <= MAX_BOARD_SIZE:
+                raise RequestError(f"size must be an integer from 3 to {MAX_BOARD_SIZE}")
+            if mode not in ("simple", "general"):
+                raise RequestError("mode must be 'simple' or 'general'")
+            match = Match(self._next_id, size, mode)
+            self._next_id += 1
+            self.matches[match.id] = match
+            self._join(conn, match, watch=False)
+        elif op in ("join", "watch"):
+            self._join(conn, self._match(request), watch=op == "watch")
+        elif op == "move":
+            self._move(conn, self._match(request), request)
+        elif op == "leave":
+            self._leave(conn, self._match(request).id)
+            conn.send({"type": "left", "match": request["match"]})
+        else:
+            raise RequestError(f"unknown op {op!r}")
+
+    def _match(self, request: dict) -> Match:
+        if not _is_int(request.get("match")):
+            raise RequestError("match must be an integer")
+        match = self.matches.get(request["match"])
+        if match is None:
+            raise RequestError(f"no match {request.get('match')!r}")
+        return match
+
+    def _join(self, conn: Connection, match: Match, watch: bool):
+        seat = None
+        if watch:
+            match.watchers.add(conn)
+        else:
+            if None not in match.seats:
+                raise RequestError(f"match {match.id} is full")
+            seat = match.seats.index(None)
+            match.seats[seat] = conn
+        conn.matches.add(match.id)
+        game = match.game
+        conn.send({
+            "type": "joined",
+            "match": match.id,
+            "seat": seat,
+            "player": None if seat is None else game.players[seat].label,
+            "size": game.board_size,
+            "mode": game.mode,
+            "moves": [list(entry.move) for entry in game._history],
+            "turn": None if game.is_over() else game.current_player.label,
+        })
+
+    def _move(self, conn: Connection, match: Match, request: dict):
+        game = match.game
+        if match.seats[game._turn] is not conn:
+            raise RequestError("not your turn")
+        row, col, letter = request.get("row"), request.get("col"), request.get("letter")
+        if not (_is_int(row) and _is_int(col) and game._in_bounds(row, col)):
+            raise RequestError("row and col must be on the board")
+        if letter not in ("S", "O"):
+            raise RequestError("letter must be 'S' or 'O'")
+        move = Move(row, col, letter)
+        if not game.is_valid_move(move):
+            raise RequestError("invalid move")
+        mover = game.current_player.label
+        new_sos = game.push(move)
+        self.moves += 1
+        # encoded once however many players and watchers receive it
+        update = encode(match.update(move, mover, new_sos))
+        for other in match.connections():
+            other.write(update)
+
+    def _leave(self, conn: Connection, match_id: int):
+        conn.matches.discard(match_id)
+        match = self.matches.get(match_id)
+        if match is None:
+            return
+        match.seats = [None if seat is conn else seat for seat in match.seats]
+        match.watchers.discard(conn)
+        if not match.connections():
+            del self.matches[match_id]
+
+
+async def _client_games(host: str, port: int, games: int, size: int, mode: str, rng: random.Random, latencies):
+    """Open `games` matches on one connection, holding both seats of each, and play them
+    all at once: every round sends one random move per unfinished match in a single
+    write, then reads the updates, which come back in request order."""
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def send(messages):
+        writer.write(b"".join(json.dumps(message).encode() + b"\n" for message in messages))
+        await writer.drain()
+
+    await send([{"op": "new", "size": size, "mode": mode} for _ in range(games)])
+    ids = [json.loads(await reader.readline())["match"] for _ in range(games)]
+    await send([{"op": "join", "match": match_id} for match_id in ids])
+    for _ in ids:
+        await reader.readline()
+    live = {match_id: SOSGame(board_size=size, mode=mode) for match_id in ids}
+    moves = 0
+    while live:
+        batch = [(match_id, rng.choice(list(game.legal_moves()))) for match_id, game in live.items()]
+        start = time.perf_counter()
+        await send([{"op": "move", "match": match_id, "row": move.row, "col": move.col, "letter": move.label}
+                    for match_id, move in batch])
+        for match_id, move in batch:
+            update = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            assert update["type"] == "move" and update["match"] == match_id, update
+            game = live[match_id]
+            game.push(move)
+            moves += 1
+            if game.is_over():
+                del live[match_id]
+    writer.close()
+    await writer.wait_closed()
+    return moves
+
+
+async def load_test(matches: int = 1000, connections: int = 50, size: int = 6, mode: str = "general",
+                    host: str | None = None, port: int = PORT, seed: int = 0) -> dict:
+    """Play random matches against a server and report throughput and latency.
+
+    With no host a server is started in this event loop on a free port.
+    """
+    server = None
+    if host is None:
+        server = await SOSServer().start("127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+    connections = max(1, min(connections, matches))
+    shares = [matches // connections + (i < matches % connections) for i in range(connections)]
+    latencies = []
+    start = time.perf_counter()
+    try:
+        counts = await asyncio.gather(*(
+            _client_games(host, port, share, size, mode, random.Random(seed * 7919 + i), latencies)
+            for i, share in enumerate(shares)
+        ))
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1e3 if latencies else 0.0
+
+    return {
+        "matches": matches,
+        "connections": connections,
+        "moves": sum(counts),
+        "seconds": round(elapsed, 3),
+        "moves_per_second": round(sum(counts) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(0.5), 3),
+        "p99_ms": round(percentile(0.99), 3),
+        "max_ms": round(latencies[-1] * 1e3, 3) if latencies else 0.0,
+    }
+
+
+async def serve(host: str, port: int):
+    server = await SOSServer().start(host, port)
+    print(f"serving on {host}:{port}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m server", description="SOS game server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_args = commands.add_parser("serve", help="run the server")
+    serve_args.add_argument("--host", default="127.0.0.1")
+    serve_args.add_argument("--port", type=int, default=PORT)
+    load_args = commands.add_parser("loadtest", help="play random matches and measure the server")
+    load_args.add_argument("--host", default=None, help="server to test (default: one started in-process)")
+    load_args.add_argument("--port", type=int, default=PORT)
+    load_args.add_argument("--matches", type=int, default=1000)
+    load_args.add_argument("--connections", type=int, default=50)
+    load_args.add_argument("--size", type=int, default=6)
+    load_args.add_argument("--mode", choices=("simple", "general"), default="general")
+    load_args.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+    report = asyncio.run(load_test(args.matches, args.connections, args.size, args.mode,
+                                   args.host, args.port, args.seed))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
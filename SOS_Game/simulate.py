@@ -0,0 +1,158 @@
+"""Headless batch self-play.
+
+    python -m simulate --games 100000 --size 6 --mode general --players greedy random
+
+Games are split into fixed-size chunks, each seeded from --seed and its chunk
+number, and farmed out to a process pool. Results are merged as chunks
+finish, so memory stays flat however many games are played, and the totals
+do not depend on the number of workers.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from game_logic import SOSGame, DEFAULT_PLAYERS
+from ai import POLICIES, make_player
+
+CHUNK_SIZE = 250
+
+
+class SimulationStats:
+    """Running win/tie/score totals, mergeable across chunks."""
+    def __init__(self, labels=()):
+        self.games = 0
+        self.ties = 0
+        self.moves = 0
+        self.wins = {label: 0 for label in labels}
+        self.total_scores = {label: 0 for label in labels}
+
+    def add_game(self, game: SOSGame, moves: int):
+        self.games += 1
+        self.moves += moves
+        if game.has_winner():
+            self.wins[game.winner_label] = self.wins.get(game.winner_label, 0) + 1
+        else:
+            self.ties += 1
+        for label, score in game.scores.items():
+            self.total_scores[label] = self.total_scores.get(label, 0) + score
+
+    def merge(self, other: "SimulationStats"):
+        self.games += other.games
+        self.ties += other.ties
+        self.moves += other.moves
+        for label, count in other.wins.items():
+            self.wins[label] = self.wins.get(label, 0) + count
+        for label, score in other.total_scores.items():
+            self.total_scores[label] = self.total_scores.get(label, 0) + score
+
+    def as_dict(self) -> dict:
+        games = self.games or 1
+        return {
+            "games": self.games,
+            "wins": self.wins,
+            "ties": self.ties,
+            "win_rate": {label: count / games for label, count in self.wins.items()},
+            "tie_rate": self.ties / games,
+            "mean_score": {label: score / games for label, score in self.total_scores.items()},
+            "mean_moves": self.moves / games,
+        }
+
+
+def play_game(game: SOSGame, players) -> int:
+    """Play one game to the end with one computer player per seat; returns the move count."""
+    seats = {p.label: player for p, player in zip(game.players, players)}
+    moves = 0
+    while not game.is_over():
+        game.push(seats[game.current_player.label].choose_move(game))
+        moves += 1
+    return moves
+
+
+def run_chunk(size: int, mode: str, policies, count: int, seed: int,
+              backend: str = "list", time_limit: float = 0.1) -> SimulationStats:
+    players = [make_player(policy, seed=seed * 31 + seat, time_limit=time_limit)
+               for seat, policy in enumerate(policies)]
+    stats = SimulationStats(p.label for p in DEFAULT_PLAYERS)
+    for _ in range(count):
+        game = SOSGame(players=DEFAULT_PLAYERS, board_size=size, mode=mode, backend=backend)
+        stats.add_game(game, play_game(game, players))
+    return stats
+
+
+def simulate(games: int, size: int, mode: str = "general", policies=("random", "random"), *,
+             workers: int | None = None, chunk_size: int = CHUNK_SIZE, seed: int = 0,
+             backend: str = "list", time_limit: float = 0.1, on_chunk=None) -> SimulationStats:
+    """Play `games` games and return the merged stats.
+
+    `on_chunk(stats)` is called with the running totals after each chunk.
+    workers=1 plays everything in this process.
+    """
+    assert len(policies) == len(DEFAULT_PLAYERS), "need one policy per player"
+    counts = [min(chunk_size, games - start) for start in range(0, games, chunk_size)]
+    jobs = ((size, mode, tuple(policies), count, seed + i, backend, time_limit)
+            for i, count in enumerate(counts))
+    total = SimulationStats(p.label for p in DEFAULT_PLAYERS)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for job in jobs:
+            total.merge(run_chunk(*job))
+            if on_chunk:
+                on_chunk(total)
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # keep a bounded number of chunks in flight so millions of games never queue up at once
+        pending = set()
+        for job in jobs:
+            pending.add(pool.submit(run_chunk, *job))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+                    if on_chunk:
+                        on_chunk(total)
+        for future in wait(pending).done:
+            total.merge(future.result())
+            if on_chunk:
+                on_chunk(total)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulate", description="Headless SOS self-play.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=6)
+    parser.add_argument("--mode", choices=("simple", "general"), default="general")
+    parser.add_argument("--players", nargs=2, choices=sorted(POLICIES), default=["random", "random"],
+                        metavar="POLICY", help=f"one of {sorted(POLICIES)} per player")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=("list", "bitboard"), default="list")
+    parser.add_argument("--time-limit", type=float, default=0.1, help="seconds per alphabeta/mcts move")
+    parser.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def progress(stats):
+        if not args.quiet:
+            print(f"\r{stats.games}/{args.games} games", end="", file=sys.stderr, flush=True)
+
+    stats = simulate(
+        args.games, args.size, args.mode, args.players, workers=args.workers,
+        chunk_size=args.chunk_size, seed=args.seed, backend=args.backend,
+        time_limit=args.time_limit, on_chunk=progress,
+    )
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        print(file=sys.stderr)
+    summary = stats.as_dict()
+    summary["seconds"] = round(elapsed, 3)
+    summary["games_per_second"] = round(stats.games / elapsed, 1) if elapsed else None
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
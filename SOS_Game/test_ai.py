@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+from game_logic import SOSGame, Move
+from ai import AlphaBetaPlayer, EvaluationCache
+
+
+class TestAlphaBetaPlayer(unittest.TestCase):
+    def test_takes_winning_move_in_simple_mode(self):
+        game = SOSGame(board_size=5, mode="simple")
+        game.push(Move(2, 0, "S"))
+        game.push(Move(2, 1, "O"))
+        move = AlphaBetaPlayer(time_limit=1.0).choose_move(game)
+        self.assertEqual(move, Move(2, 2, "S"))
+
+    def test_does_not_hand_over_a_win(self):
+        game = SOSGame(board_size=5, mode="simple")
+        game.push(Move(0, 0, "S"))
+        move = AlphaBetaPlayer(time_limit=0.5, max_depth=2).choose_move(game)
+        game.push(move)
+        # no reply may complete an SOS
+        for r in range(5):
+            for c in range(5):
+                for letter in "SO":
+                    if game.is_valid_move(Move(r, c, letter)):
+                        self.assertEqual(game._find_new_sos_from_move(Move(r, c, letter)), [])
+
+    def test_prefers_bigger_capture_in_general_mode(self):
+        game = SOSGame(board_size=3, mode="general")
+        for r, c in [(0, 0), (0, 2), (2, 0), (2, 2)]:
+            game.push(Move(r, c, "S"))
+        move = AlphaBetaPlayer(time_limit=1.0, max_depth=1).choose_move(game)
+        self.assertEqual(move, Move(1, 1, "O"))
+
+    def test_game_is_left_unchanged(self):
+        for backend in ("list", "bitboard"):
+            game = SOSGame(board_size=4, mode="general", backend=backend)
+            game.push(Move(0, 0, "S"))
+            before = (game._current_moves, dict(game.scores), game.current_player, game._empty_count)
+            AlphaBetaPlayer(time_limit=0.2).choose_move(game)
+            after = (game._current_moves, dict(game.scores), game.current_player, game._empty_count)
+            self.assertEqual(before, after)
+            self.assertIsNone(game._sym_keys, "symmetry tracking is only on during the search")
+
+    def test_respects_time_limit_on_large_board(self):
+        player = AlphaBetaPlayer(time_limit=0.2)
+        game = SOSGame(board_size=10, mode="general")
+        start = time.perf_counter()
+        move = player.choose_move(game)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertTrue(game.is_valid_move(move))
+        self.assertGreaterEqual(player.last_depth, 1)
+
+    def test_solves_small_board(self):
+        player = AlphaBetaPlayer(time_limit=10.0)
+        game = SOSGame(board_size=3, mode="simple")
+        player.choose_move(game)
+        self.assertEqual(player.last_depth, 9)
+
+    def test_cancel_stops_a_search_in_another_thread(self):
+        player = AlphaBetaPlayer(time_limit=30.0)
+        game = SOSGame(board_size=8, mode="general")
+        moves = []
+        thread = threading.Thread(target=lambda: moves.append(player.choose_move(game)))
+        start = time.perf_counter()
+        thread.start()
+        time.sleep(0.1)
+        player.cancel()
+        thread.join(5.0)
+        self.assertLess(time.perf_counter() - start, 5.0)
+        self.assertTrue(game.is_valid_move(moves[0]))
+
+    def test_returns_none_when_game_over(self):
+        game = SOSGame(board_size=3, mode="simple")
+        for move in [Move(0, 0, "S"), Move(0, 1, "O"), Move(0, 2, "S")]:
+            game.process_move(move)
+        self.assertIsNone(AlphaBetaPlayer().choose_move(game))
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = EvaluationCache(maxsize=2)
+        cache.put(1, "a")
+        cache.put(2, "b")
+        self.assertEqual(cache.get(1), "a")
+        cache.put(3, "c")
+        self.assertNotIn(2, cache)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+        cache.clear()
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_search_shares_entries_between_symmetric_positions(self):
+        player = AlphaBetaPlayer(time_limit=5.0, max_depth=3)
+        game = SOSGame(board_size=4, mode="general")
+        game.push(Move(0, 0, "S"))
+        player.choose_move(game)
+        table = player._tables[4, 4, "SOS", "general"]
+        size = len(table)
+        mirrored = SOSGame(board_size=4, mode="general")
+        mirrored.push(Move(3, 3, "S"))
+        move = player.choose_move(mirrored)
+        self.assertTrue(mirrored.is_valid_move(move))
+        self.assertEqual(len(table), size)
+        self.assertGreater(table.hits, 0)
+
+    def test_small_table_still_finds_moves(self):
+        player = AlphaBetaPlayer(time_limit=0.3, table_size=16)
+        game = SOSGame(board_size=5, mode="general")
+        move = player.choose_move(game)
+        self.assertTrue(game.is_valid_move(move))
+        self.assertLessEqual(len(player._tables[5, 5, "SOS", "general"]), 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+import unittest
+from game_logic import SOSGame, Move, Player, DEFAULT_PLAYERS
+from analysis import AnalysisService
+
+
+def position():
+    game = SOSGame(board_size=4, mode="general")
+    game.push(Move(0, 0, "S"))
+    game.push(Move(0, 1, "O"))
+    return game
+
+
+class TestAnalysisService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = AnalysisService(workers=1, time_limit=0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.close()
+
+    def test_best_move_and_score(self):
+        result = self.service.submit(position()).result(timeout=10)
+        self.assertEqual(result.move, Move(0, 2, "S"))
+        self.assertGreaterEqual(result.depth, 1)
+        score = self.service.submit(position(), kind="score").result(timeout=10)
+        self.assertIsNone(score.move)
+        self.assertGreaterEqual(score.value, 1)
+
+    def test_higher_priority_runs_first(self):
+        service = self.service
+        finished = []
+        blocker = service.submit(SOSGame(board_size=6, mode="general"))
+        futures = [service.submit(position(), priority=priority) for priority in (0, 0, 5)]
+        for name, future in zip(("low", "low2", "high"), futures):
+            future.add_done_callback(lambda _, name=name: finished.append(name))
+        blocker.result(timeout=10)
+        for future in futures:
+            future.result(timeout=10)
+        self.assertEqual(finished, ["high", "low", "low2"])
+
+    def test_deadline_expires_queued_requests(self):
+        service = self.service
+        blocker = service.submit(SOSGame(board_size=6, mode="general"))
+        late = service.submit(position(), timeout=0.01)
+        with self.assertRaises(TimeoutError):
+            late.result(timeout=10)
+        blocker.result(timeout=10)
+        self.assertGreaterEqual(service.stats()["expired"], 1)
+
+    def test_deadline_caps_the_search(self):
+        start = time.perf_counter()
+        result = self.service.submit(SOSGame(board_size=8, mode="general"), timeout=0.2).result(timeout=10)
+        self.assertLess(result.search_seconds, 0.2)
+        self.assertLess(time.perf_counter() - start, 2)
+
+    def test_cancelled_requests_are_skipped(self):
+        blocker = self.service.submit(SOSGame(board_size=6, mode="general"))
+        queued = self.service.submit(position())
+        self.assertTrue(queued.cancel())
+        blocker.result(timeout=10)
+        self.assertTrue(queued.cancelled())
+
+    def test_errors_reach_the_caller(self):
+        players = DEFAULT_PLAYERS + (Player("C", "Green"),)
+        with self.assertRaises(AssertionError):
+            self.service.submit(SOSGame(players=players, board_size=4)).result(timeout=10)
+
+    def test_asyncio(self):
+        result = asyncio.run(self.service.analyze(position()))
+        self.assertEqual(result.move, Move(0, 2, "S"))
+
+    def test_stats(self):
+        self.service.submit(position()).result(timeout=10)
+        stats = self.service.stats()
+        self.assertGreaterEqual(stats["completed"], 1)
+        self.assertEqual(stats["queued"], 0)
+        self.assertGreaterEqual(stats["queue_latency"]["count"], stats["completed"])
+
+
+class TestWorkerFailure(unittest.TestCase):
+    def test_dead_worker_fails_its_request_and_is_replaced(self):
+        with AnalysisService(workers=1, time_limit=30) as service:
+            running = service.submit(SOSGame(board_size=12, mode="general"))
+            while not running.running():
+                time.sleep(0.01)
+            first = service._processes[0]
+            first.kill()
+            with self.assertRaises(RuntimeError):
+                running.result(timeout=10)
+            self.assertIsNot(service._processes[0], first)
+            service.time_limit = 0.05
+            self.assertEqual(service.submit(position()).result(timeout=10).move, Move(0, 2, "S"))
+            stats = service.stats()
+            self.assertEqual((stats["failed"], stats["restarts"]), (1, 1))
+
+
+class TestSessions(unittest.TestCase):
+    def test_session_returns_to_its_worker(self):
+        with AnalysisService(workers=2, time_limit=0.02) as service:
+            workers = {service.submit(position(), session="game-1").result(timeout=10).worker
+                       for _ in range(4)}
+            self.assertEqual(len(workers), 1)
+        with self.assertRaises(RuntimeError):
+            service.submit(position())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import random
+import unittest
+from game_logic import SOSGame, Move
+
+try:
+    import numpy as np
+    from batch_engine import BatchSOSGame, S, O
+except ImportError:  # numpy is optional; only the batch engine needs it
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestBatchSOSGame(unittest.TestCase):
+    def _scalar_games(self, batch, size, mode, seed):
+        rng = random.Random(seed)
+        orders = []
+        for _ in range(batch):
+            cells = [(r, c) for r in range(size) for c in range(size)]
+            rng.shuffle(cells)
+            orders.append([(r, c, rng.choice("SO")) for r, c in cells])
+        return orders
+
+    def test_matches_scalar_engine(self):
+        for mode in ("simple", "general"):
+            batch, size = 16, 5
+            orders = self._scalar_games(batch, size, mode, seed=len(mode))
+            engine = BatchSOSGame(batch, size, mode)
+            games = [SOSGame(board_size=size, mode=mode) for _ in range(batch)]
+            for step in range(size * size):
+                rows = [order[step][0] for order in orders]
+                cols = [order[step][1] for order in orders]
+                letters = [S if order[step][2] == "S" else O for order in orders]
+                gained = engine.step(rows, cols, letters)
+                for b, game in enumerate(games):
+                    if game.is_over():
+                        self.assertEqual(gained[b], 0)
+                        continue
+                    self.assertEqual(gained[b], len(game.push(Move(*orders[b][step]))))
+            for b, game in enumerate(games):
+                self.assertTrue(engine.done[b])
+                self.assertEqual(list(engine.scores[b]), [game.scores[p.label] for p in game.players])
+                expected = [p.label for p in game.players].index(game.winner_label) if game.has_winner() else -1
+                self.assertEqual(engine.winner[b], expected)
+
+    def test_occupied_cell_is_ignored(self):
+        engine = BatchSOSGame(2, 3)
+        engine.step([0, 0], [0, 0], [S, S])
+        engine.step([0, 1], [0, 1], [O, O])
+        self.assertEqual(list(engine.turn), [1, 0])
+        self.assertEqual(list(engine.empty), [8, 7])
+
+    def test_off_board_moves_are_ignored(self):
+        engine = BatchSOSGame(2, 3)
+        engine.step([3, -7], [0, 0], [S, S])
+        engine.step([0, 1], [-1, 3], [O, O])
+        self.assertFalse(engine.boards.any())
+        self.assertEqual(list(engine.empty), [9, 9])
+        self.assertEqual(list(engine.turn), [0, 0])
+        engine.step([0, 0], [0, 0], [S, S])
+        self.assertEqual(list(engine.empty), [8, 8])
+
+    def test_from_game_and_random_playout(self):
+        game = SOSGame(board_size=4, mode="general")
+        game.push(Move(0, 0, "S"))
+        game.push(Move(0, 1, "O"))
+        game.push(Move(0, 2, "S"))
+        engine = BatchSOSGame.from_game(game, 64)
+        self.assertEqual(engine.cells[0, 0, 1], O)
+        self.assertEqual(list(engine.scores[0]), [1, 0])
+        scores, winner = engine.play_random(np.random.default_rng(0))
+        self.assertTrue(engine.done.all())
+        self.assertTrue((engine.empty == 0).all())
+        self.assertTrue(((winner >= -1) & (winner < 2)).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from unittest import mock
+import benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self._min_sample = benchmarks.MIN_SAMPLE
+        benchmarks.MIN_SAMPLE = 0.0
+
+    def tearDown(self):
+        benchmarks.MIN_SAMPLE = self._min_sample
+
+    def test_engine_benchmarks_cover_both_modes(self):
+        results = benchmarks.run_engine(sizes=(3, 4), repeat=1)
+        self.assertIn("process_move/simple/3", results)
+        self.assertIn("playout/general/4", results)
+        self.assertIn("find_new_sos/general/4", results)
+        self.assertNotIn("find_new_sos/simple/4", results)
+        self.assertEqual(results["process_move/general/4"]["ops"], 16)
+        self.assertTrue(all(entry["seconds"] > 0 for entry in results.values()))
+
+    def test_gui_is_skipped_without_tkinter(self):
+        with mock.patch.dict(sys.modules, {"tkinter": None}):
+            results, reason = benchmarks.run_gui(sizes=(3,), repeat=1)
+        self.assertIsNone(results)
+        self.assertIn("Tk unavailable", reason)
+
+    def test_compare_flags_only_slowdowns_past_the_threshold(self):
+        baseline = {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "c": {"seconds": 1.0}}
+        results = {"a": {"seconds": 1.2}, "b": {"seconds": 1.5}, "c": {"seconds": 0.5}, "new": {"seconds": 9.0}}
+        rows, regressions = benchmarks.compare(results, baseline, threshold=0.25)
+        self.assertEqual([row[0] for row in rows], ["b", "a", "c"])
+        self.assertEqual(regressions, ["b"])
+
+    def test_main_writes_json_and_fails_on_regression(self):
+        handle, path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        try:
+            with redirect_stderr(StringIO()):
+                self.assertEqual(benchmarks.main(["--sizes", "3", "--repeat", "1", "--no-gui", "--out", path]), 0)
+            with open(path) as f:
+                report = json.load(f)
+            self.assertEqual(report["skipped"], {"gui": "--no-gui"})
+            for entry in report["results"].values():
+                entry["seconds"] /= 100
+            with open(path, "w") as f:
+                json.dump(report, f)
+            with redirect_stderr(StringIO()) as err, redirect_stdout(StringIO()):
+                status = benchmarks.main(["--sizes", "3", "--repeat", "1", "--no-gui", "--baseline", path])
+            self.assertEqual(status, 1)
+            self.assertIn("REGRESSION", err.getvalue())
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
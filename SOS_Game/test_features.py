@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+from game_logic import SOSGame, Move, Player, DEFAULT_PLAYERS
+from ai import RandomPlayer
+from simulate import play_game
+from records import RecordWriter, record_from_game
+
+try:
+    import numpy as np
+    from features import FeatureExtractor, iter_batches, extract, write_dataset
+except ImportError:  # numpy is optional; only feature extraction needs it
+    np = None
+
+
+def random_records(count, size=5, mode="general"):
+    records = []
+    for seed in range(count):
+        game = SOSGame(board_size=size, mode=mode)
+        play_game(game, [RandomPlayer(seed), RandomPlayer(seed + 100)])
+        records.append(record_from_game(game))
+    return records
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestFeatures(unittest.TestCase):
+    def test_planes_of_a_small_position(self):
+        game = SOSGame(board_size=3, mode="general")
+        game.push(Move(0, 0, "S"))
+        game.push(Move(0, 1, "O"))
+        batch = extract([game])
+        planes = dict(zip(FeatureExtractor.for_game(game).names, batch.planes[0]))
+        self.assertEqual(planes["S"][0].tolist(), [1, 0, 0])
+        self.assertEqual(planes["O"][0].tolist(), [0, 1, 0])
+        self.assertEqual(planes["empty"].sum(), 7)
+        self.assertEqual(planes["completes_S"].tolist(), [[0, 0, 1], [0, 0, 0], [0, 0, 0]])
+        self.assertEqual(planes["completes_O"].sum(), 0)
+        self.assertEqual(batch.to_move[0], 0)
+        self.assertEqual(batch.next_move[0], -1)
+
+    def test_ownership_follows_the_scorer(self):
+        game = SOSGame(board_size=3, mode="general")
+        for move in (Move(0, 0, "S"), Move(1, 1, "O"), Move(0, 2, "S"), Move(2, 2, "S"), Move(2, 0, "S")):
+            game.push(move)
+        batch = extract([game])
+        names = FeatureExtractor.for_game(game).names
+        planes = dict(zip(names, batch.planes[0]))
+        # B completed the diagonal with (2, 2), then A the other diagonal with (2, 0)
+        self.assertEqual(planes["owner_1"].tolist(), [[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+        self.assertEqual(planes["owner_0"].tolist(), [[0, 0, 1], [0, 1, 0], [1, 0, 0]])
+        self.assertEqual(batch.scores[0].tolist(), [1, 1])
+        # a rejected move resets last_new_sos but changes nothing the planes show
+        game.process_move(Move(0, 0, "O"))
+        np.testing.assert_array_equal(extract([game]).planes, batch.planes)
+
+    def test_record_positions_match_games(self):
+        records = random_records(5)
+        extractor = FeatureExtractor(5)
+        batches = list(iter_batches(records, 7, extractor, copy=True))
+        self.assertEqual(sum(len(batch.planes) for batch in batches), sum(len(r.moves) for r in records))
+        planes = np.concatenate([batch.planes for batch in batches])
+        next_move = np.concatenate([batch.next_move for batch in batches])
+        expected = extractor.new_batch(len(planes))
+        i = 0
+        for record in records:
+            game = SOSGame(players=record.players, board_size=5, mode=record.mode)
+            for move in record.moves:
+                extractor.write(expected, i, game, move)
+                game.push(move)
+                i += 1
+        np.testing.assert_array_equal(planes, expected.planes)
+        np.testing.assert_array_equal(next_move, expected.next_move)
+
+    def test_streaming_reuses_one_buffer(self):
+        records = random_records(3)
+        batches = iter_batches(records, 16)
+        first = next(batches)
+        second = next(batches)
+        self.assertIs(first.planes, second.planes)
+        tail = list(batches)[-1]
+        self.assertLessEqual(len(tail.planes), 16)
+
+    def test_move_lists_and_games_mix(self):
+        game = SOSGame(board_size=6)
+        game.push(Move(2, 2, "O"))
+        batch = next(iter_batches([[Move(0, 0, "S"), Move(0, 1, "O")], game], 8))
+        self.assertEqual(len(batch.planes), 3)
+        self.assertEqual(batch.next_move.tolist(), [0, 3, -1])
+
+    def test_variants(self):
+        players = DEFAULT_PLAYERS + (Player("C", "Green"),)
+        game = SOSGame(players=players, board_size=(3, 5), mode="general", word="CAT")
+        game.push(Move(0, 0, "C"))
+        game.push(Move(0, 1, "A"))
+        extractor = FeatureExtractor.for_game(game)
+        self.assertEqual(extractor.shape, (3 + 1 + 3 + 3, 3, 5))
+        planes = dict(zip(extractor.names, extract([game]).planes[0]))
+        self.assertEqual(planes["completes_T"][0, 2], 1)
+
+    def test_write_dataset(self):
+        out = tempfile.mkdtemp()
+        path = os.path.join(out, "games.sosr")
+        try:
+            records = random_records(4)
+            with RecordWriter(path) as writer:
+                for record in records:
+                    writer.write_record(record)
+            count = write_dataset(path, out, batch_size=10)
+            self.assertEqual(count, sum(len(r.moves) for r in records))
+            planes = np.load(os.path.join(out, "planes.npy"), mmap_mode="r")
+            self.assertEqual(planes.shape, (count, 2 + 1 + 2 + 2, 5, 5))
+            self.assertEqual(np.load(os.path.join(out, "next_move.npy")).min(), 0)
+        finally:
+            shutil.rmtree(out)
+
+
+if __name__ == "__main__":
+    unittest.main()
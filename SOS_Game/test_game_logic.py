@@ -1,5 +1,11 @@
+import os
+import pickle
+import random
+import subprocess
+import sys
+import time
 import unittest
-from game_logic import SOSGame, Move, DEFAULT_PLAYERS
+from game_logic import SOSGame, Move, Player, DEFAULT_PLAYERS, BitBoard, line_index, cell_symmetries
 
 
 def triple_same_cells(a, b):
@@ -55,6 +61,7 @@ class TestSOSSimpleMode(unittest.TestCase):
 
         self.assertFalse(self.game.has_winner())
         self.assertTrue(self.game.is_tied(), "Full board with no SOS should be a tie")
+        self.assertTrue(self.game.is_over(), "A tied game is over")
 
 
 class TestSOSGeneralMode(unittest.TestCase):
@@ -128,6 +135,491 @@ class TestSOSGeneralMode(unittest.TestCase):
         self.game.process_move(Move(1, 1, "S"))
         self.assertFalse(self.game.is_valid_move(Move(1, 1, "O")), "Second move on same cell must be invalid")
 
+    def test_off_board_moves_are_invalid(self):
+        for r, c in ((0, 3), (3, 0), (-1, 0), (0, -1), (3, 3)):
+            move = Move(r, c, "S")
+            self.assertFalse(self.game.is_valid_move(move), f"{move} is off the board")
+            self.assertEqual(self.game.process_move(move), [])
+            with self.assertRaises(ValueError):
+                self.game.push(move)
+        self.assertEqual(self.game._empty_count, 9)
+        self.assertEqual(len(list(self.game.legal_moves())), 18)
+        self.assertEqual(self.game._cell_label(1, 0), "")
+        self.game.push(Move(1, 0, "S"))
+        self.game.push(Move(1, 2, "S"))
+        self.assertEqual(self.game.sos_count(Move(1, 1, "O")), 1)
+        self.assertEqual(self.game.sos_count(Move(0, 4, "O")), 0, "(0, 4) is not (1, 1)")
+
+
+class TestSOSSimpleModeBitBoard(TestSOSSimpleMode):
+    def setUp(self):
+        self.game = SOSGame(players=DEFAULT_PLAYERS, board_size=3, mode="simple", backend="bitboard")
+
+
+class TestSOSGeneralModeBitBoard(TestSOSGeneralMode):
+    def setUp(self):
+        self.game = SOSGame(players=DEFAULT_PLAYERS, board_size=3, mode="general", backend="bitboard")
+
+
+class TestBoardBackendsAgree(unittest.TestCase):
+    def test_random_general_games_match_list_backend(self):
+        rng = random.Random(449)
+        for size in (3, 5, 8, (4, 9), 12):
+            listed = SOSGame(board_size=size, mode="general", backend="list")
+            packed = SOSGame(board_size=size, mode="general", backend="bitboard")
+            moves = list(listed.legal_moves())[::2]
+            rng.shuffle(moves)
+            for row, col, _ in moves:
+                move = Move(row, col, rng.choice("SO"))
+                self.assertEqual(listed.process_move(move), packed.process_move(move))
+                self.assertEqual(listed._threats, packed._threats)
+                listed.toggle_player()
+                packed.toggle_player()
+            self.assertEqual(listed.scores, packed.scores)
+            self.assertEqual(listed._current_moves, packed._current_moves)
+            self.assertTrue(packed.is_over())
+            while packed.undo_move():
+                listed.undo_move()
+                self.assertEqual(listed._threats, packed._threats)
+
+    def test_reset_keeps_backend(self):
+        game = SOSGame(board_size=4, backend="bitboard")
+        game.process_move(Move(0, 0, "S"))
+        game.reset_game(board_size=6)
+        self.assertIsInstance(game._board, BitBoard)
+        self.assertEqual(game._cell_label(0, 0), "")
+        self.assertEqual(len(game._current_moves), 6)
+
+    def test_bitboard_pickles_without_its_tables(self):
+        game = SOSGame(board_size=12, mode="general", backend="bitboard")
+        game.push(Move(0, 0, "S"))
+        game.push(Move(0, 1, "O"))
+        copy = pickle.loads(pickle.dumps(game))
+        self.assertIs(copy._board._tables, game._board._tables)
+        self.assertEqual(copy.push(Move(0, 2, "S")), [((0, 0), (0, 1), (0, 2))])
+
+
+class TestLineIndex(unittest.TestCase):
+    def test_line_counts(self):
+        self.assertEqual(len(line_index(3).lines), 8)
+        # n-2 per row and column, (n-2)^2 per diagonal direction
+        self.assertEqual(len(line_index(5).lines), 2 * 5 * 3 + 2 * 3 * 3)
+
+    def test_index_is_shared_between_games(self):
+        first = SOSGame(board_size=7)
+        second = SOSGame(board_size=7, mode="general")
+        self.assertIs(first._lines, second._lines)
+        self.assertIs(first._lines, line_index(7))
+
+    def test_each_line_completes_once(self):
+        game = SOSGame(board_size=3, mode="general")
+        game.process_move(Move(0, 0, "S"))
+        game.process_move(Move(0, 2, "S"))
+        self.assertEqual(len(game.process_move(Move(0, 1, "O"))), 1)
+        self.assertEqual(game.process_move(Move(0, 1, "S")), [], "occupied cell cannot rescore")
+
+
+class TestIncrementalEndDetection(unittest.TestCase):
+    def test_general_tie_after_equal_scores(self):
+        game = SOSGame(board_size=3, mode="general")
+        a, b = (p.label for p in DEFAULT_PLAYERS)
+        game.process_move(Move(0, 0, "S"))
+        game.process_move(Move(0, 1, "O"))
+        game.process_move(Move(0, 2, "S"))  # A scores
+        game.toggle_player()
+        game.process_move(Move(2, 0, "S"))
+        game.process_move(Move(2, 1, "O"))
+        game.process_move(Move(2, 2, "S"))  # B scores
+        self.assertEqual(game.scores, {a: 1, b: 1})
+        for c in range(3):
+            game.process_move(Move(1, c, "S"))
+        self.assertTrue(game.is_over())
+        self.assertTrue(game.is_tied())
+        self.assertFalse(game.has_winner())
+
+    def test_simple_not_tied_until_full(self):
+        game = SOSGame(board_size=3, mode="simple")
+        game.process_move(Move(0, 0, "S"))
+        self.assertFalse(game.is_tied())
+
+    def test_reset_restores_counters(self):
+        game = SOSGame(board_size=3, mode="general")
+        for r in range(3):
+            for c in range(3):
+                game.process_move(Move(r, c, "O"))
+        self.assertTrue(game.is_over())
+        game.reset_game(board_size=4)
+        self.assertFalse(game.is_over())
+        self.assertFalse(game.is_tied())
+        self.assertEqual(game._empty_count, 16)
+
+
+class TestUndo(unittest.TestCase):
+    @staticmethod
+    def _snapshot(game):
+        return (
+            game._current_moves, dict(game.scores), game.current_player, game.is_over(),
+            game.has_winner(), game.is_tied(), game.winner_label, game._empty_count,
+        )
+
+    def test_undo_restores_every_state_in_random_games(self):
+        rng = random.Random(5)
+        for backend in ("list", "bitboard"):
+            for mode in ("simple", "general"):
+                game = SOSGame(board_size=5, mode=mode, backend=backend)
+                snapshots = []
+                while not game.is_over():
+                    empty = [(r, c) for r in range(5) for c in range(5) if game._cell_label(r, c) == ""]
+                    r, c = rng.choice(empty)
+                    snapshots.append(self._snapshot(game))
+                    game.push(Move(r, c, rng.choice("SO")))
+                while snapshots:
+                    self.assertIsNotNone(game.pop())
+                    self.assertEqual(self._snapshot(game), snapshots.pop())
+                self.assertIsNone(game.undo_move())
+
+    def test_history_records_mover_and_lines_made(self):
+        game = SOSGame(board_size=3, mode="general")
+        for move in (Move(0, 0, "S"), Move(0, 1, "O"), Move(0, 2, "S")):
+            game.push(move)
+        game.process_move(Move(0, 0, "O"))
+        self.assertEqual([entry.mover for entry in game._history], [0, 1, 0])
+        self.assertEqual([entry.made for entry in game._history], [[], [], [((0, 0), (0, 1), (0, 2))]])
+
+    def test_undo_reopens_simple_win(self):
+        game = SOSGame(board_size=3, mode="simple")
+        game.process_move(Move(0, 0, "S"))
+        game.process_move(Move(0, 1, "O"))
+        game.process_move(Move(0, 2, "S"))
+        self.assertTrue(game.has_winner())
+        self.assertEqual(game.undo_move(), Move(0, 2, "S"))
+        self.assertFalse(game.has_winner())
+        self.assertTrue(game.is_valid_move(Move(0, 2, "O")))
+
+    def test_push_passes_turn_and_rejects_invalid(self):
+        game = SOSGame(board_size=3)
+        first = game.current_player
+        game.push(Move(1, 1, "S"))
+        self.assertNotEqual(game.current_player, first)
+        with self.assertRaises(ValueError):
+            game.push(Move(1, 1, "O"))
+        game.pop()
+        self.assertEqual(game.current_player, first)
+
+
+class TestCloneAndKey(unittest.TestCase):
+    def test_clone_is_independent(self):
+        for backend in ("list", "bitboard"):
+            game = SOSGame(board_size=4, mode="general", backend=backend)
+            game.push(Move(0, 0, "S"))
+            game.push(Move(0, 1, "O"))
+            copy = game.clone()
+            copy.push(Move(0, 2, "S"))
+            self.assertEqual(game._cell_label(0, 2), "")
+            self.assertEqual(game.scores, {"A": 0, "B": 0})
+            self.assertEqual(copy.scores, {"A": 1, "B": 0})
+            self.assertNotEqual(game.current_player, copy.current_player)
+            copy.pop()
+            copy.pop()
+            self.assertEqual(game._cell_label(0, 1), "O", "undo on the clone must not touch the original")
+            only_first = SOSGame(board_size=4)
+            only_first.push(Move(0, 0, "S"))
+            self.assertEqual(copy.key(), only_first.key())
+
+    def test_key_ignores_move_order_and_is_restored_by_undo(self):
+        first = SOSGame(board_size=5)
+        second = SOSGame(board_size=5, backend="bitboard")
+        empty_key = first.key()
+        first.push(Move(1, 1, "S"))
+        first.push(Move(3, 2, "O"))
+        second.push(Move(3, 2, "O"))
+        second.push(Move(1, 1, "S"))
+        self.assertEqual(first.key(), second.key())
+        self.assertNotEqual(first.key(), empty_key)
+        first.pop()
+        first.pop()
+        self.assertEqual(first.key(), empty_key)
+
+    def test_pickle_leaves_out_the_shared_tables(self):
+        game = SOSGame(board_size=12, mode="general")
+        game.push(Move(0, 0, "S"))
+        game.push(Move(0, 1, "O"))
+        data = pickle.dumps(game)
+        self.assertLess(len(data), 4096)
+        copy = pickle.loads(data)
+        self.assertIs(copy._lines, line_index(12))
+        self.assertEqual(copy.key(), game.key())
+        self.assertEqual(copy.push(Move(0, 2, "S")), [((0, 0), (0, 1), (0, 2))])
+        self.assertEqual(copy.scores, {"A": 1, "B": 0})
+        copy.pop()
+        self.assertEqual(copy._threats, game._threats)
+
+    def test_canonical_key_is_shared_by_symmetric_boards(self):
+        moves = [Move(0, 1, "S"), Move(1, 3, "O"), Move(2, 2, "S")]
+        keys = set()
+        for perm in cell_symmetries(4):
+            game = SOSGame(board_size=4, mode="general")
+            for move in moves:
+                r, c = divmod(perm[move.row * 4 + move.col], 4)
+                game.push(Move(r, c, move.label))
+            keys.add(game.canonical_key())
+            key, sym = game.canonical()
+            self.assertEqual(key, game.canonical_key())
+            self.assertEqual(game.symmetric_keys()[sym], key)
+        self.assertEqual(len(keys), 1)
+        other = SOSGame(board_size=4, mode="general")
+        for move in moves[:2] + [Move(2, 2, "O")]:
+            other.push(move)
+        self.assertNotIn(other.canonical_key(), keys)
+
+    def test_canonical_key_is_restored_by_undo_and_reset(self):
+        game = SOSGame(board_size=5)
+        self.assertFalse(game.track_symmetries())
+        empty = game.canonical_key()
+        game.push(Move(0, 0, "S"))
+        game.push(Move(4, 3, "O"))
+        copy = game.clone()
+        game.pop()
+        game.pop()
+        self.assertEqual(game.canonical_key(), empty)
+        self.assertNotEqual(copy.canonical_key(), empty)
+        copy.reset_game()
+        self.assertEqual(copy.canonical_key(), empty)
+
+    def test_tracked_symmetric_keys_match_the_board(self):
+        rng = random.Random(16)
+        game = SOSGame(board_size=(4, 6), mode="general")
+        self.assertIsNone(game._sym_keys)
+        game.push(Move(1, 1, "S"))
+        self.assertFalse(game.track_symmetries())
+        plain = game.clone()
+        plain.track_symmetries(False)
+        while not game.is_over():
+            move = rng.choice(list(game.legal_moves()))
+            game.push(move)
+            plain.push(move)
+            if rng.random() < 0.3:
+                game.pop()
+                plain.pop()
+            self.assertEqual(game._sym_keys, plain.symmetric_keys())
+            self.assertEqual(game.key(), game._sym_keys[0])
+        self.assertTrue(game.track_symmetries(False))
+        self.assertIsNone(plain._sym_keys)
+
+    def test_key_distinguishes_letters(self):
+        s_game = SOSGame(board_size=3)
+        o_game = SOSGame(board_size=3)
+        s_game.push(Move(1, 1, "S"))
+        o_game.push(Move(1, 1, "O"))
+        self.assertNotEqual(s_game.key(), o_game.key())
+
+
+class TestMoveIndex(unittest.TestCase):
+    @staticmethod
+    def _scan(game):
+        """Legal and scoring moves found the slow way, by trying every cell."""
+        legal, scoring = set(), {}
+        for r in range(game.rows):
+            for c in range(game.cols):
+                for letter in game.letters:
+                    move = Move(r, c, letter)
+                    if game.is_valid_move(move):
+                        legal.add(move)
+                        gained = len(game._find_new_sos_from_move(move))
+                        if gained:
+                            scoring[move] = gained
+        return legal, scoring
+
+    def _check(self, game):
+        legal, scoring = self._scan(game)
+        self.assertEqual(set(game.legal_moves()), legal)
+        self.assertEqual(len(list(game.legal_moves())), len(legal))
+        self.assertEqual({move: game.sos_count(move) for move in game.scoring_moves()}, scoring)
+
+    def test_index_matches_a_full_scan_through_moves_and_undos(self):
+        rng = random.Random(11)
+        for backend in ("list", "bitboard"):
+            game = SOSGame(board_size=6, mode="general", backend=backend)
+            while not game.is_over():
+                self._check(game)
+                game.push(rng.choice(list(game.legal_moves())))
+                if rng.random() < 0.2:
+                    game.pop()
+            self._check(game)
+            while game.pop():
+                self._check(game)
+
+    def test_index_matches_a_full_scan_on_variants(self):
+        rng = random.Random(12)
+        for board_size, word in (((4, 7), "SOS"), (5, "CAT"), ((5, 6), "SOOS")):
+            game = SOSGame(board_size=board_size, mode="general", word=word)
+            while not game.is_over():
+                self._check(game)
+                game.push(rng.choice(list(game.legal_moves())))
+                if rng.random() < 0.2:
+                    game.pop()
+            self._check(game)
+
+    def test_nothing_is_legal_after_a_simple_win(self):
+        game = SOSGame(board_size=4, mode="simple")
+        game.push(Move(0, 0, "S"))
+        game.push(Move(0, 2, "S"))
+        self.assertEqual(list(game.scoring_moves()), [Move(0, 1, "O")])
+        self.assertEqual(game.sos_count(Move(0, 1, "O")), 1)
+        self.assertEqual(game.sos_count(Move(0, 1, "S")), 0)
+        game.push(Move(0, 1, "O"))
+        self.assertEqual(list(game.legal_moves()), [])
+        self.assertEqual(list(game.scoring_moves()), [])
+
+    def test_clone_and_reset_keep_their_own_index(self):
+        game = SOSGame(board_size=4, mode="general")
+        game.push(Move(1, 0, "S"))
+        game.push(Move(1, 1, "O"))
+        copy = game.clone()
+        copy.push(Move(1, 2, "S"))
+        self.assertEqual(list(game.scoring_moves()), [Move(1, 2, "S")])
+        self.assertEqual(list(copy.scoring_moves()), [])
+        game.reset_game(board_size=3)
+        self.assertEqual(len(list(game.legal_moves())), 18)
+        self.assertEqual(list(game.scoring_moves()), [])
+
+
+class TestPerMoveScaling(unittest.TestCase):
+    """Per-move cost must not grow with the board (no full-board scans)."""
+
+    @staticmethod
+    def _seconds_per_move(size, backend, repeats=3):
+        rng = random.Random(size)
+        moves = [Move(r, c, rng.choice("SO")) for r in range(size) for c in range(size)]
+        rng.shuffle(moves)
+        best = float("inf")
+        for _ in range(repeats):
+            game = SOSGame(board_size=size, mode="general", backend=backend)
+            start = time.perf_counter()
+            for move in moves:
+                game.process_move(move)
+                game.is_over()
+                game.is_tied()
+                game.has_winner()
+            best = min(best, time.perf_counter() - start)
+        return best / len(moves)
+
+    def test_per_move_cost_flat_up_to_size_60(self):
+        for backend in ("list", "bitboard"):
+            small = self._seconds_per_move(10, backend)
+            large = self._seconds_per_move(60, backend)
+            # a full-board scan per move would make this ~36x slower
+            self.assertLess(large / small, 4, f"{backend}: {small * 1e6:.1f}us -> {large * 1e6:.1f}us per move")
+
+
+class TestVariants(unittest.TestCase):
+    THREE_PLAYERS = DEFAULT_PLAYERS + (Player(label="C", color="Green"),)
+
+    def test_three_players_take_turns(self):
+        game = SOSGame(players=self.THREE_PLAYERS, board_size=4)
+        seen = []
+        for col in range(4):
+            seen.append(game.current_player.label)
+            game.push(Move(3, col, "O"))
+        self.assertEqual(seen, ["A", "B", "C", "A"])
+
+    def test_three_player_general_result(self):
+        game = SOSGame(players=self.THREE_PLAYERS, board_size=3, mode="general")
+        # C completes the top row, then the board fills without another SOS
+        for move in (Move(0, 0, "S"), Move(0, 2, "S"), Move(0, 1, "O"), Move(1, 0, "O"),
+                     Move(1, 1, "O"), Move(1, 2, "O"), Move(2, 0, "O"), Move(2, 1, "O")):
+            game.push(move)
+        self.assertEqual(game.scores, {"A": 0, "B": 0, "C": 1})
+        game.push(Move(2, 2, "O"))
+        self.assertTrue(game.has_winner())
+        self.assertEqual(game.winner_label, "C")
+        self.assertFalse(game.is_tied())
+
+    def test_reset_starts_with_the_first_player(self):
+        game = SOSGame(players=self.THREE_PLAYERS, board_size=4)
+        game.push(Move(0, 0, "S"))
+        game.push(Move(0, 1, "S"))
+        game.reset_game()
+        self.assertEqual(game.current_player.label, "A")
+
+    def test_rectangular_board(self):
+        for backend in ("list", "bitboard"):
+            game = SOSGame(board_size=(3, 5), mode="general", backend=backend)
+            self.assertEqual(len(game._current_moves), 3)
+            self.assertEqual(len(game._current_moves[0]), 5)
+            self.assertEqual(len(list(game.legal_moves())), 30)
+            game.push(Move(0, 4, "S"))
+            game.push(Move(1, 4, "O"))
+            self.assertEqual(len(game.push(Move(2, 4, "S"))), 1)
+            self.assertTrue(game._in_bounds(2, 4))
+            self.assertFalse(game._in_bounds(3, 0))
+        # 3 per row, 1 per column and 3 per diagonal direction
+        self.assertEqual(len(line_index(3, 5).lines), 3 * 3 + 5 + 2 * 3)
+
+    def test_rectangle_symmetries_keep_the_shape(self):
+        perms = cell_symmetries(3, 5)
+        self.assertEqual(len(perms), 4)
+        lines = {frozenset(line) for line in line_index(3, 5).lines}
+        for perm in perms:
+            self.assertEqual({frozenset(perm[cell] for cell in line) for line in lines}, lines)
+        game = SOSGame(board_size=(3, 5))
+        mirrored = SOSGame(board_size=(3, 5))
+        game.push(Move(0, 0, "S"))
+        mirrored.push(Move(2, 4, "S"))
+        self.assertEqual(game.canonical_key(), mirrored.canonical_key())
+
+    def test_other_words_score_both_ways(self):
+        game = SOSGame(board_size=4, mode="general", word="CAT")
+        self.assertEqual(game.letters, ("C", "A", "T"))
+        self.assertFalse(game.is_valid_move(Move(0, 0, "S")))
+        game.push(Move(0, 0, "T"))
+        game.push(Move(0, 2, "C"))
+        self.assertEqual(list(game.scoring_moves()), [Move(0, 1, "A")])
+        self.assertEqual(len(game.push(Move(0, 1, "A"))), 1)
+        game.push(Move(1, 0, "C"))
+        game.push(Move(3, 0, "T"))
+        self.assertEqual(len(game.push(Move(2, 0, "A"))), 1)
+        self.assertEqual(game.scores, {"A": 1, "B": 1})
+
+    def test_longer_words(self):
+        game = SOSGame(board_size=(2, 5), mode="simple", word="SOOS")
+        for move in (Move(0, 0, "S"), Move(0, 1, "O"), Move(0, 3, "S")):
+            self.assertEqual(game.push(move), [])
+        self.assertEqual(list(game.scoring_moves()), [Move(0, 2, "O")])
+        self.assertEqual(game.push(Move(0, 2, "O")), [((0, 0), (0, 1), (0, 2), (0, 3))])
+        self.assertTrue(game.has_winner())
+
+    def test_bitboard_only_plays_sos(self):
+        with self.assertRaises(AssertionError):
+            SOSGame(board_size=4, word="CAT", backend="bitboard")
+
+
+class TestHeadlessImport(unittest.TestCase):
+    # generous budget for importing the engine alone (interpreter startup excluded)
+    IMPORT_BUDGET_SECONDS = 0.25
+
+    def _run_import_probe(self):
+        probe = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import game_logic\n"
+            "elapsed = time.perf_counter() - start\n"
+            "print(elapsed, 'tkinter' in sys.modules)\n"
+        )
+        here = os.path.dirname(os.path.abspath(__file__))
+        out = subprocess.run(
+            [sys.executable, "-c", probe], cwd=here, capture_output=True, text=True, check=True
+        ).stdout.split()
+        return float(out[0]), out[1] == "True"
+
+    def test_engine_does_not_import_tkinter(self):
+        _, loaded_tk = self._run_import_probe()
+        self.assertFalse(loaded_tk, "game_logic must stay importable without a GUI toolkit")
+
+    def test_engine_import_time_budget(self):
+        elapsed, _ = self._run_import_probe()
+        self.assertLess(elapsed, self.IMPORT_BUDGET_SECONDS, f"importing game_logic took {elapsed:.3f}s")
+
 
 if __name__ == "__main__":
     unittest.main()
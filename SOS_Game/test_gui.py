@@ -0,0 +1,99 @@
+import time
+import unittest
+import tkinter as tk
+from tkinter import font
+from game_logic import SOSGame, Move
+
+
+def make_board(game):
+    from GUI import SOSBoard
+    try:
+        board = SOSBoard(game)
+    except tk.TclError as exc:  # no display available
+        raise unittest.SkipTest(f"Tk unavailable: {exc}")
+    board.withdraw()
+    return board
+
+
+class TestFontCache(unittest.TestCase):
+    def setUp(self):
+        self.board = make_board(SOSGame(board_size=5, mode="general"))
+
+    def tearDown(self):
+        self.board.destroy()
+
+    def _play_some_moves(self):
+        for move in [Move(0, 0, "S"), Move(0, 1, "O"), Move(0, 2, "S"), Move(1, 1, "O"), Move(2, 2, "S")]:
+            if self.board._game.is_valid_move(move):
+                self.board._apply_move(move)
+
+    def test_font_count_constant_across_games(self):
+        self._play_some_moves()
+        self.board.reset_board()
+        self._play_some_moves()
+        baseline = len(font.names(self.board))
+        for size in (5, 9, 5, 9):
+            for _ in range(3):
+                self._play_some_moves()
+                self.board.reset_board()
+            self.board.size_var.set(size)
+            self.board.start_new_game_with_size()
+            self._play_some_moves()
+        self.board.size_var.set(5)
+        self.board.start_new_game_with_size()
+        self._play_some_moves()
+        self.assertLessEqual(len(font.names(self.board)), baseline + 1)
+
+    def test_cells_share_one_font(self):
+        self._play_some_moves()
+        fonts = {self.board.board_canvas.itemcget(item, "font") for item in self.board._letter_items.values()}
+        self.assertEqual(len(fonts), 1)
+
+
+class FailingPlayer:
+    def choose_move(self, game):
+        raise ValueError("no move")
+
+    def cancel(self):
+        pass
+
+
+class TestComputerPlayer(unittest.TestCase):
+    def test_search_error_is_shown(self):
+        board = make_board(SOSGame(board_size=4, mode="general"))
+        try:
+            board._computer = FailingPlayer()
+            board._apply_move(Move(0, 0, "S"))
+            board.computer_var.set(True)
+            deadline = time.monotonic() + 5
+            while board._searching and time.monotonic() < deadline:
+                board.update()
+            self.assertFalse(board._searching)
+            self.assertIn("no move", board.display["text"])
+            self.assertEqual(str(board.display["fg"]), "red")
+        finally:
+            board.destroy()
+
+
+class TestInstrumentBoard(unittest.TestCase):
+    def test_redraws_and_new_games_are_timed(self):
+        from instrument import instrument_board, uninstrument
+        board = make_board(SOSGame(board_size=4, mode="general"))
+        try:
+            metrics = instrument_board(board)
+            board._apply_move(Move(0, 0, "S"))
+            board.start_new_game_with_size()
+            board._apply_move(Move(1, 1, "O"))
+            stats = metrics.as_dict()
+            self.assertEqual(stats["gui.apply_move"]["count"], 2)
+            self.assertEqual(stats["game.process_move"]["count"], 2)
+            self.assertGreaterEqual(stats["gui.create_board_grid"]["count"], 1)
+            uninstrument(board)
+            self.assertIsNone(board.metrics)
+            self.assertNotIn("process_move", vars(board._game))
+        finally:
+            board.destroy()
+
+
+if __name__ == "__main__":
+    unittest.main()
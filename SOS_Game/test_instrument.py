@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from game_logic import SOSGame, Move
+from instrument import Histogram, instrument_game, uninstrument, profile, profile_text
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_and_percentiles(self):
+        hist = Histogram()
+        for ns in [100] * 98 + [5000, 1_000_000]:
+            hist.add(ns)
+        self.assertEqual(hist.count, 100)
+        self.assertEqual(hist.max_ns, 1_000_000)
+        self.assertEqual(hist.percentile(0.5), 128)
+        self.assertEqual(hist.percentile(0.99), 8192)
+        self.assertEqual(hist.percentile(1.0), 1 << 20)
+        self.assertEqual(Histogram().as_dict()["mean_us"], 0)
+
+
+class TestInstrumentGame(unittest.TestCase):
+    def _play(self, game):
+        for move in [Move(0, 0, "S"), Move(0, 1, "O"), Move(0, 2, "S")]:
+            game.push(move)
+        game.is_tied()
+
+    def test_counts_calls_on_the_instrumented_game_only(self):
+        game = SOSGame(board_size=4, mode="general")
+        metrics = instrument_game(game)
+        self._play(game)
+        other = SOSGame(board_size=4, mode="general")
+        self._play(other)
+        stats = metrics.as_dict()
+        self.assertEqual(stats["game.process_move"]["count"], 3)
+        # only the scoring third move searches for the lines it completed
+        self.assertEqual(stats["game.find_new_sos"]["count"], 1)
+        self.assertEqual(stats["game.is_tied"]["count"], 1)
+        self.assertEqual(game.scores, other.scores)
+        self.assertIn("game.process_move", metrics.report())
+
+    def test_uninstrument_restores_the_class_methods(self):
+        game = SOSGame(board_size=4)
+        metrics = instrument_game(game)
+        uninstrument(game)
+        self.assertNotIn("process_move", vars(game))
+        self._play(game)
+        self.assertEqual(metrics.histogram("game.process_move").count, 0)
+
+    def test_clone_is_not_instrumented(self):
+        game = SOSGame(board_size=4, mode="general")
+        metrics = instrument_game(game)
+        copy = game.clone()
+        self._play(copy)
+        self.assertEqual(metrics.histogram("game.process_move").count, 0)
+        self.assertEqual(copy._cell_label(0, 1), "O")
+        self.assertEqual(game._cell_label(0, 1), "")
+        self.assertEqual(copy.clone()._instrumented, ())
+
+
+class TestProfile(unittest.TestCase):
+    def test_profile_dumps_stats(self):
+        handle, path = tempfile.mkstemp(suffix=".prof")
+        os.close(handle)
+        try:
+            with profile(path) as profiler:
+                self._work()
+            self.assertGreater(os.path.getsize(path), 0)
+            self.assertIn("process_move", profile_text(profiler))
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def _work():
+        game = SOSGame(board_size=5, mode="general")
+        for r in range(5):
+            for c in range(5):
+                game.push(Move(r, c, "S" if (r + c) % 2 else "O"))
+
+
+if __name__ == "__main__":
+    unittest.main()
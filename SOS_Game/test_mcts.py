@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from game_logic import SOSGame, Move, Player, DEFAULT_PLAYERS
+from mcts import MCTSPlayer
+
+
+class TestMCTSPlayer(unittest.TestCase):
+    def test_takes_winning_move_in_simple_mode(self):
+        game = SOSGame(board_size=5, mode="simple")
+        game.push(Move(2, 0, "S"))
+        game.push(Move(2, 1, "O"))
+        move = MCTSPlayer(iterations=200, seed=1).choose_move(game)
+        self.assertEqual(move, Move(2, 2, "S"))
+
+    def test_game_is_left_unchanged(self):
+        game = SOSGame(board_size=4, mode="general")
+        game.push(Move(1, 1, "S"))
+        before = (game._current_moves, dict(game.scores), game.current_player, game._empty_count)
+        MCTSPlayer(iterations=300, seed=2).choose_move(game)
+        after = (game._current_moves, dict(game.scores), game.current_player, game._empty_count)
+        self.assertEqual(before, after)
+
+    def test_cancel_stops_a_search_in_another_thread(self):
+        player = MCTSPlayer(time_limit=30.0, seed=4)
+        game = SOSGame(board_size=6, mode="general")
+        moves = []
+        thread = threading.Thread(target=lambda: moves.append(player.choose_move(game)))
+        start = time.perf_counter()
+        thread.start()
+        time.sleep(0.1)
+        player.cancel()
+        thread.join(5.0)
+        self.assertLess(time.perf_counter() - start, 5.0)
+        self.assertTrue(game.is_valid_move(moves[0]))
+
+    def test_tree_is_reused_after_opponent_move(self):
+        game = SOSGame(board_size=4, mode="general")
+        player = MCTSPlayer(iterations=2000, seed=3)
+        game.push(player.choose_move(game))
+        root = player._root
+        reply, child = max(root.children.items(), key=lambda kv: kv[1].visits)
+        game.push(Move(*divmod(reply[0], 4), reply[1]))
+        self.assertIs(player._reuse(game), child)
+
+    def test_reuse_follows_the_move_order_with_three_players(self):
+        game = SOSGame(players=DEFAULT_PLAYERS + (Player("C", "Green"),), board_size=4, mode="general")
+        player = MCTSPlayer(iterations=3000, seed=6)
+        game.push(player.choose_move(game))
+        first, child = max(player._root.children.items(), key=lambda kv: kv[1].visits)
+        second, grandchild = max(child.children.items(), key=lambda kv: kv[1].visits)
+        for cell, letter in (first, second):
+            game.push(Move(*divmod(cell, 4), letter))
+        self.assertIs(player._reuse(game), grandchild)
+        self.assertEqual(grandchild.mover, 2)
+
+    def test_unknown_position_starts_a_new_tree(self):
+        player = MCTSPlayer(iterations=50, seed=4)
+        player.choose_move(SOSGame(board_size=4))
+        other = SOSGame(board_size=4)
+        other.push(Move(0, 0, "O"))
+        other.push(Move(3, 3, "O"))
+        other.push(Move(1, 2, "O"))
+        self.assertIsNone(player._reuse(other))
+
+    def test_root_parallel_workers(self):
+        game = SOSGame(board_size=4, mode="general")
+        player = MCTSPlayer(iterations=100, workers=2, seed=5)
+        try:
+            move = player.choose_move(game)
+        finally:
+            player.close()
+        self.assertTrue(game.is_valid_move(move))
+        self.assertEqual(player.last_iterations, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
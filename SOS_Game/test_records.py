@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from game_logic import SOSGame, Move, Player
+from ai import RandomPlayer
+from simulate import play_game
+from records import (GameRecord, RecordWriter, read_records, record_from_game, replay,
+                     replay_file, to_text, encode_record)
+
+
+def random_game(size, mode, seed):
+    game = SOSGame(board_size=size, mode=mode)
+    play_game(game, [RandomPlayer(seed), RandomPlayer(seed + 1)])
+    return game
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".sosr")
+        os.close(handle)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_round_trip_replays_to_the_same_result(self):
+        games = [random_game(size, mode, seed)
+                 for seed, (size, mode) in enumerate([(3, "simple"), (6, "general"), (12, "general")])]
+        with RecordWriter(self.path) as writer:
+            for game in games:
+                writer.write(game)
+        replayed = list(replay_file(self.path))
+        packed = list(replay_file(self.path, backend="bitboard"))
+        self.assertEqual(len(replayed), len(games))
+        for original, game, packed_game in zip(games, replayed, packed):
+            self.assertEqual(packed_game._current_moves, original._current_moves)
+            self.assertEqual(game._current_moves, original._current_moves)
+            self.assertEqual(game.scores, original.scores)
+            self.assertEqual(game.winner_label, original.winner_label)
+            self.assertTrue(game.is_over())
+
+    def test_one_byte_per_move_on_small_boards(self):
+        game = random_game(6, "general", 7)
+        size = len(encode_record(record_from_game(game)))
+        players = sum(2 + len(p.label) + len(p.color) for p in game.players)
+        self.assertEqual(size, 5 + players + 36)
+
+    def test_writer_appends_to_an_existing_file(self):
+        for seed in range(2):
+            with RecordWriter(self.path) as writer:
+                writer.write(random_game(4, "general", seed))
+        self.assertEqual(len(list(read_records(self.path))), 2)
+
+    def test_unfinished_game_and_custom_players(self):
+        players = (Player("X", "Green"), Player("Yé", "Purple"))
+        game = SOSGame(players=players, board_size=5, mode="general")
+        game.push(Move(0, 0, "S"))
+        game.push(Move(4, 4, "O"))
+        with RecordWriter(self.path) as writer:
+            writer.write(game)
+        record, = read_records(self.path)
+        self.assertEqual(record, GameRecord(5, "general", players, (Move(0, 0, "S"), Move(4, 4, "O"))))
+        self.assertEqual(replay(record).current_player, players[0])
+
+    def test_rejects_bad_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a record file")
+        with self.assertRaises(ValueError):
+            list(read_records(self.path))
+        game = random_game(4, "general", 3)
+        with RecordWriter(self.path + "2") as writer:
+            writer.write(game)
+        with open(self.path + "2", "rb") as f:
+            data = f.read()
+        os.remove(self.path + "2")
+        with open(self.path, "wb") as f:
+            f.write(data[:-3])
+        with self.assertRaises(ValueError):
+            list(read_records(self.path))
+
+    def test_rejects_truncated_player_list(self):
+        with RecordWriter(self.path) as writer:
+            writer.write(random_game(4, "general", 5))
+        with open(self.path, "rb") as f:
+            data = f.read()
+        record, = read_records(self.path)
+        start = len(data) - len(encode_record(record)) + 5     # past the file and record headers
+        players = sum(2 + len(p.label) + len(p.color) for p in record.players)
+        for cut in range(start, start + players):
+            with open(self.path, "wb") as f:
+                f.write(data[:cut])
+            with self.assertRaisesRegex(ValueError, "truncated player list"):
+                list(read_records(self.path))
+
+    def test_rejects_corrupt_header_and_move_fields(self):
+        with RecordWriter(self.path) as writer:
+            writer.write(random_game(3, "general", 2))
+        with open(self.path, "rb") as f:
+            data = f.read()
+        record, = read_records(self.path)
+        start = len(data) - len(encode_record(record))     # the record header
+        corruptions = [(start, 0, "board size"), (start + 1, 7, "mode"), (len(data) - 1, 200, "off the board")]
+        for offset, value, text in corruptions:
+            with open(self.path, "wb") as f:
+                f.write(data[:offset] + bytes([value]) + data[offset + 1:])
+            with self.assertRaisesRegex(ValueError, text):
+                list(read_records(self.path))
+
+    def test_text_export(self):
+        game = SOSGame(board_size=3, mode="simple")
+        for move in [Move(0, 0, "S"), Move(1, 1, "O"), Move(0, 1, "O"), Move(2, 2, "S")]:
+            game.push(move)
+        text = to_text(record_from_game(game))
+        self.assertIn("3x3 simple", text)
+        self.assertIn("4. B S at (2, 2)  +1 SOS", text)
+        self.assertIn("S O .\n. O .\n. . S", text)
+        self.assertIn("winner B", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import unittest
+from server import SOSServer, Connection, MAX_WRITE_BUFFER, MAX_REQUEST_BYTES, load_test
+
+
+class TestSOSServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = SOSServer()
+        self.tcp = await self.server.start("127.0.0.1", 0)
+        self.port = self.tcp.sockets[0].getsockname()[1]
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for _, writer in self.clients:
+            writer.close()
+        self.tcp.close()
+        await self.tcp.wait_closed()
+
+    async def connect(self):
+        client = await asyncio.open_connection("127.0.0.1", self.port)
+        self.clients.append(client)
+        return client
+
+    @staticmethod
+    async def request(client, message):
+        reader, writer = client
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        return await TestSOSServer.receive(client)
+
+    @staticmethod
+    async def receive(client):
+        return json.loads(await asyncio.wait_for(client[0].readline(), 5))
+
+    async def test_two_players_and_a_watcher_get_incremental_updates(self):
+        alice, bob, carol = await self.connect(), await self.connect(), await self.connect()
+        joined = await self.request(alice, {"op": "new", "size": 3, "mode": "simple"})
+        self.assertEqual((joined["seat"], joined["player"], joined["moves"]), (0, "A", []))
+        match = joined["match"]
+        self.assertEqual((await self.request(bob, {"op": "join", "match": match}))["player"], "B")
+
+        update = await self.request(alice, {"op": "move", "match": match, "row": 0, "col": 0, "letter": "S"})
+        self.assertEqual(update["turn"], "B")
+        self.assertEqual(await self.receive(bob), update)
+
+        watching = await self.request(carol, {"op": "watch", "match": match})
+        self.assertIsNone(watching["seat"])
+        self.assertEqual(watching["moves"], [[0, 0, "S"]])
+
+        await self.request(bob, {"op": "move", "match": match, "row": 0, "col": 1, "letter": "O"})
+        await self.receive(alice)
+        await self.receive(carol)
+        final = await self.request(alice, {"op": "move", "match": match, "row": 0, "col": 2, "letter": "S"})
+        self.assertTrue(final["over"])
+        self.assertEqual(final["winner"], "A")
+        self.assertEqual(final["sos"], [[[0, 0], [0, 1], [0, 2]]])
+        self.assertNotIn("board", final)
+        self.assertEqual(await self.receive(carol), final)
+
+    async def test_bad_requests_get_errors(self):
+        alice, bob = await self.connect(), await self.connect()
+        match = (await self.request(alice, {"op": "new", "size": 4}))["match"]
+        await self.request(bob, {"op": "join", "match": match})
+        cases = [
+            (bob, {"op": "move", "match": match, "row": 0, "col": 0, "letter": "S"}, "not your turn"),
+            (alice, {"op": "move", "match": match, "row": 4, "col": 0, "letter": "S"}, "on the board"),
+            (alice, {"op": "move", "match": match, "row": 0, "col": 0, "letter": "X"}, "letter"),
+            (alice, {"op": "join", "match": match}, "full"),
+            (alice, {"op": "move", "match": 999, "row": 0, "col": 0, "letter": "S"}, "no match"),
+            (alice, {"op": "fly"}, "unknown op"),
+            (alice, {"op": "new", "size": 2}, "size"),
+            (alice, {"op": "join", "match": [match]}, "match must be an integer"),
+            (alice, {"op": "watch", "match": {"id": match}}, "match must be an integer"),
+            (alice, {"op": "move", "match": True, "row": 0, "col": 0, "letter": "S"}, "match must be"),
+            (alice, {"op": "move", "match": match, "row": False, "col": 0, "letter": "S"}, "on the board"),
+            (alice, {"op": "move", "match": match, "row": 0, "col": True, "letter": "S"}, "on the board"),
+        ]
+        for client, message, text in cases:
+            reply = await self.request(client, message)
+            self.assertEqual(reply["type"], "error")
+            self.assertIn(text, reply["message"])
+        alice[1].write(b"not json\n")
+        self.assertEqual((await self.receive(alice))["type"], "error")
+        await self.request(alice, {"op": "move", "match": match, "row": 0, "col": 0, "letter": "S"})
+        await self.receive(bob)
+        reply = await self.request(bob, {"op": "move", "match": match, "row": 0, "col": 0, "letter": "O"})
+        self.assertEqual(reply["message"], "invalid move")
+
+    async def test_oversized_and_deeply_nested_requests(self):
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        alice = await self.connect()
+        match = (await self.request(alice, {"op": "new"}))["match"]
+        alice[1].write(b"[" * 20000 + b"]" * 20000 + b"\n")
+        self.assertIn("nested", (await self.receive(alice))["message"])
+        self.assertEqual((await self.request(alice, {"op": "watch", "match": match}))["type"], "joined")
+        alice[1].write(b"x" * (MAX_REQUEST_BYTES + 10) + b"\n")
+        self.assertIn("limited", (await self.receive(alice))["message"])
+        self.assertEqual(await asyncio.wait_for(alice[0].read(), 5), b"")
+        self.assertNotIn(match, self.server.matches)
+        self.assertEqual(errors, [])
+
+    async def test_matches_are_dropped_when_everyone_disconnects(self):
+        client = await self.connect()
+        match = (await self.request(client, {"op": "new"}))["match"]
+        self.assertEqual((await self.request(client, {"op": "join", "match": match}))["seat"], 1)
+        self.assertIn(match, self.server.matches)
+        client[1].close()
+        await client[1].wait_closed()
+        for _ in range(100):
+            if match not in self.server.matches:
+                break
+            await asyncio.sleep(0.01)
+        self.assertNotIn(match, self.server.matches)
+
+
+class TestSlowClients(unittest.TestCase):
+    class Transport:
+        def __init__(self):
+            self.buffered = 0
+            self.aborted = False
+
+        def get_write_buffer_size(self):
+            return self.buffered
+
+        def abort(self):
+            self.aborted = True
+
+    class Writer:
+        def __init__(self, transport):
+            self.transport = transport
+            self.written = []
+
+        def write(self, data):
+            self.written.append(data)
+            self.transport.buffered += len(data)
+
+    def test_client_that_stops_reading_is_dropped(self):
+        transport = self.Transport()
+        conn = Connection(self.Writer(transport))
+        update = b"x" * 4096
+        while not conn.dropped:
+            conn.write(update)
+        self.assertTrue(transport.aborted)
+        self.assertLessEqual(transport.buffered, MAX_WRITE_BUFFER + len(update))
+        sent = len(conn.writer.written)
+        conn.write(update)
+        self.assertEqual(len(conn.writer.written), sent)
+
+
+class TestLoadTest(unittest.TestCase):
+    def test_plays_every_match_to_the_end(self):
+        report = asyncio.run(load_test(matches=30, connections=4, size=4))
+        self.assertEqual(report["matches"], 30)
+        self.assertEqual(report["moves"], 30 * 16)
+        self.assertGreater(report["moves_per_second"], 0)
+        self.assertGreaterEqual(report["p99_ms"], report["p50_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
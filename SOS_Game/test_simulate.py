@@ -0,0 +1,58 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+from game_logic import SOSGame, Move
+from simulate import simulate, run_chunk, play_game, main
+
+
+class OnlyO:
+    """Fills the board with O, so no SOS is ever made."""
+    def choose_move(self, game):
+        r, c = divmod(min(game._empty), game.board_size)
+        return Move(r, c, "O")
+
+
+class TestSimulate(unittest.TestCase):
+    def test_totals_add_up(self):
+        stats = simulate(40, 4, "general", ("random", "greedy"), workers=1, chunk_size=7)
+        self.assertEqual(stats.games, 40)
+        self.assertEqual(sum(stats.wins.values()) + stats.ties, 40)
+        self.assertEqual(stats.moves, 40 * 16)
+
+    def test_results_do_not_depend_on_workers(self):
+        args = (30, 5, "simple", ("random", "random"))
+        inline = simulate(*args, workers=1, chunk_size=4, seed=3)
+        pooled = simulate(*args, workers=2, chunk_size=4, seed=3)
+        self.assertEqual(inline.as_dict(), pooled.as_dict())
+
+    def test_chunks_are_reproducible(self):
+        first = run_chunk(4, "general", ("greedy", "random"), 10, seed=11)
+        second = run_chunk(4, "general", ("greedy", "random"), 10, seed=11)
+        self.assertEqual(first.as_dict(), second.as_dict())
+        packed = run_chunk(4, "general", ("greedy", "random"), 10, seed=11, backend="bitboard")
+        self.assertEqual(first.as_dict(), packed.as_dict())
+
+    def test_simple_mode_full_board_tie_ends_the_game(self):
+        game = SOSGame(board_size=3, mode="simple")
+        self.assertEqual(play_game(game, [OnlyO(), OnlyO()]), 9)
+        self.assertTrue(game.is_over())
+        self.assertTrue(game.is_tied())
+        stats = simulate(300, 3, "simple", ("random", "random"), workers=1)
+        self.assertEqual(stats.games, 300)
+        self.assertGreater(stats.ties, 0)
+
+    def test_greedy_beats_random(self):
+        stats = simulate(50, 5, "general", ("greedy", "random"), workers=1)
+        self.assertGreater(stats.wins["A"], stats.wins["B"])
+
+    def test_cli_prints_json_summary(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main(["--games", "5", "--size", "3", "--workers", "1", "--quiet"])
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["games"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
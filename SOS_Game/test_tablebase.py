@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+from game_logic import SOSGame, Move, cell_symmetries, line_index
+from ai import RandomPlayer
+from tablebase import Tablebase, TablebasePlayer
+
+
+def minimax(game):
+    """Plain negamax over SOSGame, no memo and no symmetry, for checking the solver."""
+    best = None
+    for r in range(game.board_size):
+        for c in range(game.board_size):
+            for letter in "SO":
+                move = Move(r, c, letter)
+                if not game.is_valid_move(move):
+                    continue
+                gained = len(game.push(move))
+                if game.mode == "simple" and gained:
+                    value = 1
+                elif game.is_over():
+                    value = gained
+                else:
+                    value = gained - minimax(game)
+                game.pop()
+                best = value if best is None else max(best, value)
+    return best
+
+
+def random_position(size, mode, moves, seed):
+    game = SOSGame(board_size=size, mode=mode)
+    player = RandomPlayer(seed)
+    for _ in range(moves):
+        game.push(player.choose_move(game))
+        if game.is_over():
+            game.pop()
+            break
+    return game
+
+
+class TestCellSymmetries(unittest.TestCase):
+    def test_symmetries_map_lines_to_lines(self):
+        for size in (3, 4, 5):
+            lines = {frozenset(line) for line in line_index(size).lines}
+            perms = cell_symmetries(size)
+            self.assertEqual(len(set(perms)), 8)
+            for perm in perms:
+                self.assertEqual(sorted(perm), list(range(size * size)))
+                self.assertEqual({frozenset(perm[cell] for cell in line) for line in lines}, lines)
+
+
+class TestTablebase(unittest.TestCase):
+    def test_values_match_plain_minimax(self):
+        for mode in ("simple", "general"):
+            table = Tablebase(3, mode)
+            for seed in range(12):
+                game = random_position(3, mode, 5, seed)
+                self.assertEqual(table.value(game), minimax(game), (mode, seed))
+
+    def test_symmetric_positions_share_an_entry(self):
+        table = Tablebase(3, "general")
+        corner = SOSGame(board_size=3, mode="general")
+        corner.push(Move(0, 0, "S"))
+        table.value(corner)
+        size = len(table)
+        other = SOSGame(board_size=3, mode="general")
+        other.push(Move(2, 2, "S"))
+        table.value(other)
+        self.assertEqual(len(table), size)
+
+    def test_best_move_achieves_the_value(self):
+        table = Tablebase(3, "general")
+        for seed in range(10):
+            game = random_position(3, "general", 3, seed)
+            value = table.value(game)
+            move = table.best_move(game)
+            gained = len(game.push(move))
+            self.assertEqual(gained - (0 if game.is_over() else table.value(game)), value)
+
+    def test_save_and_load(self):
+        table = Tablebase(3, "simple")
+        self.assertEqual(table.solve_all(), 0)
+        handle, path = tempfile.mkstemp(suffix=".tb")
+        os.close(handle)
+        try:
+            table.save(path)
+            loaded = Tablebase.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual((loaded.board_size, loaded.mode), (3, "simple"))
+        self.assertEqual(loaded.values, table.values)
+
+
+class TestTablebasePlayer(unittest.TestCase):
+    def test_perfect_player_never_loses_on_3x3(self):
+        table = Tablebase(3, "simple")
+        table.solve_all()
+        perfect = TablebasePlayer(table)
+        for seed in range(20):
+            game = SOSGame(board_size=3, mode="simple")
+            seats = [perfect, RandomPlayer(seed)] if seed % 2 else [RandomPlayer(seed), perfect]
+            while not game.is_over():
+                game.push(seats[game._turn].choose_move(game))
+            self.assertNotEqual(game.winner_label, game.players[seats.index(perfect) ^ 1].label)
+
+    def test_endgame_oracle_on_a_large_board(self):
+        game = random_position(7, "general", 49 - 5, 5)
+        player = TablebasePlayer(fallback=RandomPlayer(0))
+        move = player.choose_move(game)
+        self.assertTrue(game.is_valid_move(move))
+        self.assertEqual(player._endgames[(7, "general")].value(game), minimax(game))
+        self.assertEqual(player.fallback._rng.random(), RandomPlayer(0)._rng.random())
+
+
+if __name__ == "__main__":
+    unittest.main()